@@ -1 +1,4 @@
-from py import *
+from py.lc_lazy import lc_lazy_package
+from py import lc_exports
+
+lc_lazy_package(__name__, lc_exports, __name__ + '.py.')
@@ -1,8 +1,42 @@
-from qulcar.py.lc_add_tdelay import *
-from qulcar.py.lc_car_gen import *
-from qulcar.py.lc_lightcurve import *
-from qulcar.py.lc_noise import *
-from qulcar.py.lc_read import *
-from qulcar.py.lc_sample import *
-from qulcar.py.lc_spline import * 
-from qulcar.py.lc_write import *
+from qulcar.py.lc_lazy import *
+
+# public names of the modules, each module is imported on the first access
+# to one of its names (see lc_lazy_package)
+lc_exports = { \
+    'lc_add_tdelay'    : ['lc_add_tdelay', 'lc_add_tdelay_shift'], \
+    'lc_archive'       : ['lc_archive', 'lc_archive_dump', \
+                              'lc_archive_write'], \
+    'lc_bench'         : ['lc_bench', 'lc_bench_import', 'lc_bench_setup', \
+                              'lc_bench_stage', 'lc_bench_stages'], \
+    'lc_bridge'        : ['lc_bridge'], \
+    'lc_cadence'       : ['lc_cadence'], \
+    'lc_cache'         : ['lc_cache'], \
+    'lc_car_gen'       : ['lc_car_gen'], \
+    'lc_car_gen_batch' : ['lc_car_gen_batch'], \
+    'lc_ensemble'      : ['lc_ensemble', 'lc_ensemble_build', \
+                              'lc_ensemble_system'], \
+    'lc_goodfile'      : ['lc_goodfile', 'lc_goodfile_read'], \
+    'lc_lazy'          : ['lc_lazy', 'lc_lazy_package'], \
+    'lc_lightcurve'    : ['lightcurve'], \
+    'lc_metrics'       : ['lc_log', 'lc_metrics', 'lc_metrics_active', \
+                              'lc_progress', 'lc_progress_print', \
+                              'lc_set_progress', 'lc_timed', 'lc_timer', \
+                              'lc_verbose'], \
+    'lc_noise'         : ['lc_noise'], \
+    'lc_refine'        : ['lc_refine'], \
+    'lc_read'          : ['lc_evil', 'lc_read', 'lc_read_table'], \
+    'lc_rng'           : ['lc_rng', 'lc_rng_legacy', 'lc_rng_spawn'], \
+    'lc_sample'        : ['lc_sample', 'lc_sample_cache', 'lc_sample_index', \
+                              'lc_sample_schedule'], \
+    'lc_spline'        : ['lc_spline', 'lc_spline_season'], \
+    'lc_stream'        : ['lc_car_iter', 'lc_good_stream', 'lc_sample_iter'], \
+    'lc_system'        : ['lc_system'], \
+    'lc_tdelay'        : ['lc_tdelay', 'lc_tdelay_batch', 'lc_tdelay_curve', \
+                              'lc_tdelay_good', 'lc_tdelay_pairs', \
+                              'lc_tdelay_peak', 'lc_tdelay_prof', \
+                              'lc_tdelay_system'], \
+    'lc_write'         : ['lc_good_ascii_header', 'lc_good_ascii_rows', \
+                              'lc_good_table', 'lc_write'] \
+    }
+
+lc_lazy_package(__name__, lc_exports)
@@ -1,6 +1,8 @@
 import numpy as np
+from lc_bridge import *
 
-def lc_add_tdelay(time, lc, tdelay, buffer=None):
+def lc_add_tdelay(time, lc, tdelay, buffer=None, subgrid=None, meanmag=None, \
+                      tau=None, sigma=None, seed=None, rng=None):
 
     """
     NAME:
@@ -12,9 +14,12 @@ def lc_add_tdelay(time, lc, tdelay, buffer=None):
       values from the end of the light curve.
       *NOTE* - This procedure assumes uniform time spacing.  I.e., only 
       "intrinsic" light curves should be used, NOT sampled light curves.
+      Delays that are not a multiple of the time resolution require the 
+      subgrid keyword.
 
     CALLING SEQUENCE:
-      lc_add_tdelay(time, lc, tdelay, buffer=)
+      lc_add_tdelay(time, lc, tdelay, buffer=, subgrid=, meanmag=, tau=,
+                    sigma=, seed=, rng=)
 
     INPUTS:
       time   - time in units of days
@@ -22,7 +27,20 @@ def lc_add_tdelay(time, lc, tdelay, buffer=None):
       tdelay - time delay in days
 
     OPTIONAL INPUTS:
-      buffer - lc segment to prepend before shifting (modified by function)
+      buffer  - lc segment to prepend before shifting (modified by function)
+      subgrid - method for delays that are not a multiple of the time
+                resolution:
+                  'bridge'  - draw the light curve at the delayed times 
+                              from the exact CAR(1) bridge between the 
+                              grid points (see lc_bridge, requires the
+                              meanmag, tau, sigma and seed of the curve)
+                  'fourier' - band-limited (sinc) interpolation by a phase
+                              shift of the Fourier transform
+      meanmag - mean magnitude of the light curve (bridge only)
+      tau     - characteristic time scale [day] (bridge only)
+      sigma   - characteristic fluctuation amp [mag day^-1/2] (bridge only)
+      seed    - seed for the bridge draws (bridge only)
+      rng     - generator for the bridge draws instead of seed (bridge only)
 
     KEYWORDS:
 
@@ -33,33 +51,97 @@ def lc_add_tdelay(time, lc, tdelay, buffer=None):
     EXAMPLES:
 
     COMMENTS:
+      With subgrid='bridge' the curve is shifted by the whole number of
+      grid steps as usual and the remaining fraction of a step is taken
+      up by drawing each point at its delayed time conditional on the
+      two neighbouring grid values.  This is a statistically exact 
+      realization of the delayed curve, so a 1 dy or 0.1 dy intrinsic
+      curve serves any delay precision.  With subgrid='fourier' a linear
+      ramp is removed before the transform (so that the periodic 
+      extension is continuous) and restored after it; this reproduces
+      the smooth part of the curve exactly but not its sub-grid 
+      fluctuations.  As with np.roll, the first points of the result
+      (the start of the buffer, if input) are wrapped from the end.
+
+      With subgrid set, any remainder of tdelay/dt beyond round-off is
+      a sub-grid shift (see lc_add_tdelay_shift); without it, delays
+      within 0.01 of a grid step are rounded to the grid as before.
 
     REVISION HISTORY:
       2013/02/18 - Written by Greg Dobler (KITP/UCSB)
+      2026/10/17 - Added sub-grid delays (subgrid keyword)
+      2026/10/17 - Added rng keyword
 
     ------------------------------------------------------------
     """
 
 # -------- check for sufficient time resolution
-    dt    = time[1] - time[0]
-    shift = tdelay/dt
+    dt           = time[1] - time[0]
+    nshift, frac = lc_add_tdelay_shift(tdelay, dt, subgrid=subgrid)
 
-    if round(shift,2) % 1 > 1e-5:
+    if frac and subgrid not in ['bridge', 'fourier']:
         print "LC_ADD_TDELAY: Insufficient input time resolution"
         print "LC_ADD_TDELAY:    input time resolution [dy] = ", dt
         print "LC_ADD_TDELAY:    desired time delay [dy]    = ", tdelay
+        print "LC_ADD_TDELAY:    (use subgrid='bridge' or 'fourier')"
         return
 
-    shift = long(shift)
+
+
+# -------- prepend the buffer if input
+    bufflc = lc if buffer is None else np.concatenate([buffer, lc])
+
+
+
+# -------- shift by the fraction of a time step
+    if frac and subgrid=='bridge':
+        tgrid  = dt*np.arange(bufflc.size)
+        bufflc = lc_bridge(tgrid, bufflc, tgrid - frac*dt, \
+                               meanmag=meanmag, tau=tau, sigma=sigma, \
+                               seed=seed, rng=rng)
+
+    elif frac and subgrid=='fourier':
+        nbl    = bufflc.size
+        slope  = (bufflc[-1] - bufflc[0])/(nbl - 1.0)
+        ramp   = slope*np.arange(nbl)
+        ftlc   = np.fft.rfft(bufflc - ramp) * \
+            np.exp(-2j*np.pi*np.fft.rfftfreq(nbl)*frac)
+        bufflc = np.fft.irfft(ftlc, nbl) + ramp - slope*frac
 
 
 
 # -------- shift light curve (with buffer if input) and return
-    if buffer==None:
-        lc[:] = np.roll(lc,shift)
+    if buffer is None:
+        lc[:] = np.roll(bufflc,nshift)
     else:
-        bufflc    = np.concatenate([buffer, lc])
-        lc[:]     = np.roll(bufflc, shift)[buffer.size:]
-        buffer[:] = np.roll(bufflc, shift)[:buffer.size]
+        bufflc    = np.roll(bufflc, nshift)
+        lc[:]     = bufflc[buffer.size:]
+        buffer[:] = bufflc[:buffer.size]
 
     return
+
+
+
+def lc_add_tdelay_shift(tdelay, dt, subgrid=None):
+
+    """ Split a delay into a whole number of grid steps dt and the
+        remaining fraction of a step (0 if the delay is on the grid):
+        exactly, up to round-off, if subgrid is set, else with the
+        shift rounded to 0.01 steps as in the original lc_add_tdelay
+        (utility for lc_add_tdelay and lc_system) """
+
+    shift = tdelay/dt
+
+    if subgrid:
+        nshift = long(np.floor(shift))
+        frac   = shift - nshift
+        tol    = 64.*np.finfo(float).eps*max(1.0, abs(shift))
+
+        if frac <= tol or 1.0 - frac <= tol:
+            return long(round(shift)), 0.0
+
+        return nshift, frac
+
+    if round(shift,2) % 1 <= 1e-5: return long(round(shift)), 0.0
+
+    return long(np.floor(shift)), shift - np.floor(shift)
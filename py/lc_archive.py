@@ -0,0 +1,395 @@
+import numpy as np
+import os
+import json
+import shutil
+from lc_metrics import *
+
+# time axis of the arrays of an evil archive
+_evil_axes = {'time':'time', 'lc':'time', 'time_samp':'time_samp', \
+                  'lc_samp':'time_samp', 'noise':'time_samp', \
+                  'time_sp':'time_sp', 'lc_sp':'time_sp', 'usrind':None, \
+                  'lc_buff':None}
+
+@lc_timed('lc_archive_write')
+def lc_archive_write(time, lcs, type, filename, errlcs=None, path=None, \
+                         clobber=None, compress=None, chunk=None):
+
+    """
+    NAME:
+      lc_archive_write
+
+    PURPOSE:
+      Write a lightcurve instance (type=evil) or sampled lightcurves
+      (type=good) to an archive: a directory of chunked numpy arrays and
+      a json metadata sidecar, which can be read a time window at a time
+      (see lc_archive).
+
+    CALLING SEQUENCE:
+      lc_archive_write(time, lcs, type, filename, errlcs=, path=, clobber=,
+                       compress=, chunk=)
+
+    INPUTS:
+      time     - time vector in days (good only)
+      lcs      - either a single lightcurve instance or >= 1 lightcurves [mag]
+      type     - 'evil' (write lc instance) or 'good' (write lightcurves)
+      filename - name of the archive directory (e.g. 'tdc_0_evil_A.lca')
+
+    OPTIONAL INPUTS:
+      errlcs - error on the input lightcurves (vector, default is 3% in flux)
+      path   - path where the archive should be written (default is present
+               directory)
+      chunk  - number of points per chunk (default 65536)
+
+    KEYWORDS:
+      clobber  - flag to overwrite an existing archive
+      compress - flag to compress each chunk (.npz members) instead of
+                 storing each array as a memory mappable .npy file
+
+    OUTPUTS:
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      lc_archive_write([], lc, 'evil', 'tdc_0_evil_A.lca', clobber=1)
+      arc = lc_archive('tdc_0_evil_A.lca')
+      win = arc.window(1000., 1100.)       # decodes about 100 days
+
+    COMMENTS:
+      The archive holds meta.json (type, names, scalar fields, the dtype,
+      size and time axis of each array and the first and last time of
+      each chunk of each axis) and one <name>.npy or <name>.npz file per
+      array (<name>.npz has one member per chunk).  Arrays keep their
+      dtype, so an instance round trips exactly (the fits files store
+      float32).  The intrinsic time of a compact instance is stored as
+      its grid (t0, dt).  Good archives hold the columns of a good file
+      (time, lc_A, ..., err_A, ... in nanomaggies, see lc_good_table).
+
+      The archive is written to a temporary directory which is renamed
+      when complete.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    out   = (path if path else '') + filename
+    chunk = 65536 if chunk==None else int(chunk)
+    label = ['A','B','C','D']
+
+    if os.path.exists(out):
+        if not clobber:
+            raise IOError("LC_ARCHIVE: {0} exists (use clobber=1)" \
+                              .format(out))
+        if not os.path.isfile(os.path.join(out, 'meta.json')):
+            raise IOError("LC_ARCHIVE: {0} exists and is not an " \
+                              "archive".format(out))
+
+
+
+# -------- the arrays, their time axes and the scalar fields
+    if type=='evil':
+        lc_log("LC_ARCHIVE: Writing lightcurve instance to archive " + out)
+
+        if str(lcs.dtype)!='lightcurve':
+            print "LC_ARCHIVE:   'evil' convention only accepts " + \
+                "lightcurve instances as input."
+            return
+
+        arrays  = [(name, lcs[name]) for name in lcs.names if name in \
+                       _evil_axes]
+        axes    = dict((name, _evil_axes[name]) for name, arr in arrays)
+        scalars = dict((name, np.asarray(lcs[name]).item()) for name in \
+                           lcs.names if name not in _evil_axes)
+        grid    = {'t0':float(lcs.t0), 'dt':float(lcs.dt), \
+                       'n':int(lcs.lc.size)} if lcs.compact else None
+
+        if grid: arrays = [(name, arr) for name, arr in arrays if \
+                               name!='time']
+
+    elif type=='good':
+        lc_log("LC_ARCHIVE: Writing light curves to archive " + out)
+
+        if not isinstance(lcs, list): lcs = [lcs]
+
+        if len(lcs) > 4:
+            print "\nLC_ARCHIVE ERROR: number of lightcurves per system " + \
+                "cannot exceed four."
+            return
+
+        if errlcs is None: errlcs = [0.03,0.03,0.03,0.03]
+
+        arrays = [('time', np.asarray(time, dtype=float))]
+        for ilc in range(len(lcs)):
+            flux    = 10.**(-0.4*(np.asarray(lcs[ilc])-22.5)) # nanomaggies
+            arrays += [('lc_'+label[ilc], flux), \
+                           ('err_'+label[ilc], flux*errlcs[ilc])]
+
+        axes    = dict((name, 'time') for name, arr in arrays)
+        scalars = {}
+        grid    = None
+
+    else:
+        print "LC_ARCHIVE: '", type, "' file convention not understood."
+        print "LC_ARCHIVE:   ...only types 'good' or 'evil' are valid."
+        return
+
+
+
+# -------- write the arrays (chunked) to a temporary directory and
+#          replace the archive (the temporary directory is removed if
+#          anything fails)
+    meta = {'format':'lc_archive', 'version':1, 'type':type, \
+                'names':[name for name, arr in arrays] + sorted(scalars) \
+                if type=='good' else list(lcs.names), \
+                'scalars':scalars, 'grid':grid, 'compress':bool(compress), \
+                'chunk':chunk, 'arrays':{}, 'bounds':{}}
+
+    tmp = out.rstrip('/') + '.{0}.tmp'.format(os.getpid())
+    os.makedirs(tmp)
+
+    try:
+        lc_archive_dump(tmp, meta, arrays, axes)
+
+        if os.path.exists(out): shutil.rmtree(out)
+        os.rename(tmp, out)
+    except:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    return
+
+
+
+def lc_archive_dump(tmp, meta, arrays, axes):
+
+    """ Write the arrays (chunked) and the metadata of an archive to the
+        directory tmp (utility for lc_archive_write) """
+
+    chunk = meta['chunk']
+    grid  = meta['grid']
+
+    for name, arr in arrays:
+        arr    = np.ascontiguousarray(np.atleast_1d(arr))
+        nchunk = -(-arr.size//chunk)
+        chunks = [arr[ichunk*chunk:(ichunk+1)*chunk] for ichunk in \
+                      range(nchunk)]
+
+        if meta['compress']:
+            fname = name + '.npz'
+            np.savez_compressed(os.path.join(tmp, fname), \
+                                    **dict(('c{0:06d}'.format(ichunk), \
+                                                chunks[ichunk]) for ichunk \
+                                               in range(nchunk)))
+        else:
+            fname = name + '.npy'
+            np.save(os.path.join(tmp, fname), arr)
+
+        meta['arrays'][name] = {'file':fname, 'dtype':arr.dtype.str, \
+                                    'size':int(arr.size), \
+                                    'axis':axes[name]}
+
+        # first and last time of each chunk of a time axis
+        if name==axes[name]:
+            meta['bounds'][name] = [[float(ichunk[0]), float(ichunk[-1])] \
+                                        for ichunk in chunks]
+
+    if grid:
+        nchunk = -(-grid['n']//chunk)
+        meta['bounds']['time'] = [[grid['t0'] + grid['dt']*ichunk*chunk, \
+                                       grid['t0'] + grid['dt']* \
+                                       (min((ichunk+1)*chunk, grid['n'])-1)] \
+                                      for ichunk in range(nchunk)]
+
+    fout = open(os.path.join(tmp, 'meta.json'), 'w')
+    json.dump(meta, fout, indent=1, sort_keys=True)
+    fout.close()
+
+
+
+class lc_archive(object):
+
+    """
+      Read-only view of an archive written by lc_archive_write, with the
+      attributes of the file (for evil archives those of a lightcurve
+      instance).  Only the metadata is read on initialization; an array
+      is read on first access (memory mapped if the archive is not
+      compressed), and window(tmin, tmax) returns the arrays within a
+      time window reading (or decompressing) only the chunks which
+      overlap it.
+
+        arc = lc_archive('tdc_0_evil_A.lca')
+        print arc.tau, arc.tdelay          # from the metadata
+        win = arc.window(1000., 1100.)     # {'time':..., 'lc':..., ...}
+        lc  = arc.lightcurve()             # full lightcurve instance
+    """
+
+# -------- read the metadata
+    def __init__(self, filename, path=None, columns=None):
+
+        """ Read the metadata (and the columns if input) """
+
+        self.filename = (path if path else '') + filename
+
+        fin  = open(os.path.join(self.filename, 'meta.json'))
+        meta = json.load(fin)
+        fin.close()
+
+        self.meta   = meta
+        self.type   = meta['type']
+        self.dtype  = 'lightcurve' if self.type=='evil' else 'good'
+        self.names  = [str(name) for name in meta['names']]
+        self._files = {}
+
+        for name, value in meta['scalars'].items():
+            self.__dict__[str(name)] = value
+
+        if meta['grid']:
+            self.compact = 1
+            self.t0      = meta['grid']['t0']
+            self.dt      = meta['grid']['dt']
+
+        if columns:
+            for name in columns: getattr(self, name)
+
+
+# -------- archives
+    @staticmethod
+    def isarchive(filename):
+
+        """ Return True if filename is an archive """
+
+        return os.path.isfile(os.path.join(filename, 'meta.json'))
+
+
+# -------- a chunk of an array
+    def chunk(self, name, ichunk):
+
+        """ Return chunk ichunk of array name """
+
+        info  = self.meta['arrays'].get(name)
+        chunk = self.meta['chunk']
+
+        # the intrinsic time of a compact instance
+        if info is None:
+            grid = self.meta['grid']
+            return grid['t0'] + grid['dt']* \
+                np.arange(ichunk*chunk, min((ichunk+1)*chunk, grid['n']))
+
+        # open the file once (memory map or zip archive)
+        if name not in self._files:
+            self._files[name] = np.load(os.path.join(self.filename, \
+                                                         info['file']), \
+                                            mmap_mode=None if \
+                                            self.meta['compress'] else 'r')
+
+        if self.meta['compress']:
+            return self._files[name]['c{0:06d}'.format(ichunk)]
+
+        return self._files[name][ichunk*chunk:(ichunk+1)*chunk]
+
+
+# -------- read an array on first access
+    def __getattr__(self, name):
+
+        """ Read an array on first access """
+
+        if name.startswith('_') or name not in self.__dict__.get('names', []):
+            raise AttributeError(name)
+
+        info = self.meta['arrays'].get(name)
+        size = self.meta['grid']['n'] if info is None else info['size']
+
+        if info is not None and not self.meta['compress']:
+            self.chunk(name, 0)
+            value = self._files[name]
+        else:
+            nchunk = -(-size//self.meta['chunk'])
+            value  = np.concatenate([self.chunk(name, ichunk) for ichunk in \
+                                         range(nchunk)] + \
+                                        [np.zeros(0, dtype=info['dtype'] if \
+                                                      info else float)])
+
+        self.__dict__[name] = value
+
+        return value
+
+
+# -------- the arrays within a time window
+    @lc_timed('lc_archive.window')
+    def window(self, tmin, tmax, names=None):
+
+        """ Return a dictionary of the arrays (default all) within the
+            time window [tmin, tmax] of their time axis, reading only the
+            chunks which overlap the window (arrays without a time axis,
+            usrind and lc_buff, are returned whole, and scalars as they
+            are; other names raise a KeyError) """
+
+        grid  = self.meta['grid'] is not None
+        names = [name for name in self.names if name in self.meta['arrays'] \
+                     or (grid and name=='time')] if names==None else names
+        out   = {}
+
+        for name in names:
+            info = self.meta['arrays'].get(name)
+
+            # scalars, and names which are not in the archive
+            if info is None and not (grid and name=='time'):
+                if name not in self.meta['scalars']:
+                    raise KeyError("LC_ARCHIVE: '{0}' is not in the " \
+                                       "archive".format(name))
+
+                out[name] = self.meta['scalars'][name]
+                continue
+
+            axis = info['axis'] if info else 'time'
+
+            if axis is None:
+                out[name] = np.array(getattr(self, name))
+                continue
+
+            # the chunks which overlap the window, and the window within them
+            bounds = np.array(self.meta['bounds'][axis]).reshape(-1, 2)
+            ichunk = np.where((bounds[:,1] >= tmin) & \
+                                  (bounds[:,0] <= tmax))[0]
+
+            if ichunk.size==0:
+                out[name] = np.zeros(0, dtype=info['dtype'] if info else \
+                                         float)
+                continue
+
+            chunks = range(ichunk[0], ichunk[-1]+1)
+
+            if '_' + axis not in out:
+                tax  = np.concatenate([self.chunk(axis, jchunk) for jchunk \
+                                           in chunks])
+                ind0 = np.searchsorted(tax, tmin, 'left')
+                ind1 = np.searchsorted(tax, tmax, 'right')
+                out['_' + axis] = (ind0, ind1)
+
+            ind0, ind1 = out['_' + axis]
+            out[name]  = np.concatenate([self.chunk(name, jchunk) for jchunk \
+                                             in chunks])[ind0:ind1]
+
+        for name in [key for key in out if key.startswith('_')]: del out[name]
+
+        return out
+
+
+# -------- return an item by its name
+    def __getitem__(self, key):
+
+        """ Return an item by its name. """
+
+        return getattr(self, key)
+
+
+# -------- convert to a lightcurve instance
+    def lightcurve(self):
+
+        """ Return a full lightcurve instance (evil archives) """
+
+        from lc_lightcurve import lightcurve
+
+        return lightcurve(-1, -1, filename=self.filename)
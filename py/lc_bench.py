@@ -0,0 +1,437 @@
+import numpy as np
+import os
+import sys
+import json
+import glob
+import shutil
+import platform
+import tempfile
+import resource
+import subprocess
+import time as tm
+import multiprocessing as mp
+from lc_car_gen import *
+from lc_sample import *
+from lc_noise import *
+from lc_spline import *
+from lc_add_tdelay import *
+from lc_refine import *
+from lc_write import *
+from lc_read import *
+from lc_lightcurve import *
+from lc_archive import *
+from lc_lazy import *
+
+fits = lc_lazy('pyfits')
+
+# import time budgets [s] beyond the import of numpy (see lc_bench_import)
+_import_budget = {'import_package':0.01, 'import_core':0.03, \
+                      'import_all':0.06}
+
+def lc_bench(stages=None, nrep=None, baseline=None, save=None, tol=None):
+
+    """
+    NAME:
+      lc_bench
+
+    PURPOSE:
+      Benchmark the stages of the light curve pipeline (generation,
+      sampling, noise, splines, time delays and file i/o), and compare
+      the results with stored baselines.
+
+    CALLING SEQUENCE:
+      results = lc_bench(stages=, nrep=, baseline=, save=, tol=)
+
+    INPUTS:
+
+    OPTIONAL INPUTS:
+      stages   - list of stage names to run (default all, see
+                 lc_bench_stages())
+      nrep     - number of repetitions of each stage, the fastest is
+                 reported (default 3); fast stages are called several
+                 times per repetition
+      baseline - name of a json file of earlier results to compare with
+      save     - name of a json file to which the results are written
+      tol      - fractional slow down with respect to the baseline above
+                 which a stage is flagged (default 0.25)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      results - dictionary with the entry 'stages' holding, for each stage,
+                seconds (fastest repetition), peak_mb (peak resident
+                memory of the stage process), delta_mb (increase of the
+                peak over the set up of the stage), npts (number of points
+                processed), pts_per_s, file_mb (size of the file written or
+                read, if any) and, if a baseline is input, ratio
+                (seconds/baseline seconds) and regress (flag), and for the
+                import stages budget (seconds) and over_budget (flag); and
+                the entry 'meta' describing the machine
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      lc_bench(save='bench_baseline.json')
+      ...
+      res = lc_bench(baseline='bench_baseline.json')
+
+      or from the shell
+
+      python -m qulcar.py.lc_bench [baseline.json] [save.json]
+
+    COMMENTS:
+      Each stage runs in a fresh process (with its output discarded) so
+      that its peak memory is not hidden by earlier stages.  Files are
+      written to a temporary directory which is removed at the end.
+      Timings depend on the machine, so baselines should only be compared
+      on the machine on which they were made (see 'meta').
+
+      The import stages time the import of the package alone, of the
+      modules used by a generation worker (lc_car_gen and lc_noise) and
+      of every module, in a fresh interpreter and beyond the import of
+      numpy (see lc_bench_import).  They are checked against the budgets
+      _import_budget (0.01, 0.03 and 0.06 s), which hold because pyfits,
+      scipy and matplotlib are only imported on first use (see lc_lazy).
+
+      The archive stages write and read the evil file as an archive (see
+      lc_archive_write), uncompressed (memory mapped) and compressed (_z),
+      and read_evil_window reads 100 days of the compressed archive, so
+      their seconds and file_mb compare with write_evil and read_evil.
+      car_gen_refine generates the 1 day curve and refines it to 0.01 day
+      at the epochs of two visits a night (see lc_refine), to compare
+      with car_gen_hires.
+      The sample stages time the cadence indices without the cache of
+      lc_sample_schedule, sample_cached times a cache hit.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - Import stages with time budgets
+      2026/10/17 - Archive stages and file sizes
+      2026/10/17 - Sample stages without the index cache, sample_cached
+      2026/10/17 - car_gen_refine stage
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    stages = lc_bench_stages() if stages==None else stages
+    nrep   = 3 if nrep==None else nrep
+    tol    = 0.25 if tol==None else tol
+    base   = json.load(open(baseline))['stages'] if baseline else {}
+
+
+
+# -------- run each stage in its own process
+    tmpdir  = tempfile.mkdtemp(prefix='lc_bench_')
+    results = {'meta':{'python':platform.python_version(), \
+                           'numpy':np.__version__, \
+                           'machine':platform.machine(), \
+                           'node':platform.node(), \
+                           'ncpu':mp.cpu_count(), \
+                           'date':tm.strftime('%Y-%m-%d %H:%M:%S'), \
+                           'nrep':nrep}, \
+                   'stages':{}}
+
+    print "LC_BENCH: {0:<20}{1:>10}{2:>10}{3:>10}{4:>12}{5:>9}{6:>8}" \
+        .format('stage', 'seconds', 'peak MB', 'delta MB', 'pts/s', \
+                    'file MB', 'ratio')
+
+    try:
+        for stage in stages:
+            pool = mp.Pool(1, maxtasksperchild=1)
+            res  = pool.apply(lc_bench_stage, (stage, nrep, tmpdir))
+            pool.close()
+            pool.join()
+
+            # compare with the baseline
+            if stage in base:
+                res['ratio']   = res['seconds']/max(base[stage]['seconds'], \
+                                                        1e-9)
+                res['regress'] = res['ratio'] > 1.0 + tol
+
+            # compare with the import budget
+            if stage in _import_budget:
+                res['budget']      = _import_budget[stage]
+                res['over_budget'] = res['seconds'] > res['budget']
+
+            results['stages'][stage] = res
+
+            fmb = '{0:.2f}'.format(res['file_mb']) if res['file_mb'] else ''
+
+            print "LC_BENCH: {0:<20}{1:>10.4f}{2:>10.1f}{3:>10.1f}" \
+                "{4:>12.3g}{5:>9}{6:>8}{7}{8}".format(stage, res['seconds'], \
+                                                 res['peak_mb'], \
+                                                 res['delta_mb'], \
+                                                 res['pts_per_s'], \
+                                                 fmb, \
+                                                 '{0:.2f}'.format(res['ratio']) \
+                                                 if 'ratio' in res else '', \
+                                                 '  REGRESSION' if \
+                                                 res.get('regress') else '', \
+                                                 '  OVER BUDGET' if \
+                                                 res.get('over_budget') else \
+                                                 '')
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+
+# -------- report regressions, save and return
+    slow = [stage for stage in stages if \
+                results['stages'][stage].get('regress')]
+
+    if baseline:
+        print "LC_BENCH: {0} of {1} stages slower than the baseline by " \
+            "more than {2:.0f}%{3}".format(len(slow), len(stages), 100.*tol, \
+                                               ': ' + ', '.join(slow) if \
+                                               slow else '')
+
+    over = [stage for stage in stages if \
+                results['stages'][stage].get('over_budget')]
+
+    if over:
+        print "LC_BENCH: import time over budget: " + ', '.join(over)
+
+    if save:
+        fout = open(save, 'w')
+        json.dump(results, fout, indent=1, sort_keys=True)
+        fout.close()
+        print "LC_BENCH: results written to ", save
+
+
+    return results
+
+
+
+def lc_bench_stages():
+
+    """ Return the names of the stages of lc_bench (in order) """
+
+    return ['car_gen_lores', 'car_gen_medres', 'car_gen_hires', \
+                'car_gen_fft', 'car_gen_refine', 'sample_all', 'sample_daily', \
+                'sample_weekly', 'sample_season', 'sample_cached', 'noise', \
+                'spline', 'spline_season', 'add_tdelay', 'add_tdelay_bridge', \
+                'write_good_fits', 'write_good_ascii', 'write_evil', \
+                'read_good_fits', 'read_good_ascii', 'read_evil', \
+                'read_evil_lazy', 'write_evil_archive', \
+                'write_evil_archive_z', 'read_evil_archive', \
+                'read_evil_archive_z', 'read_evil_window', 'import_package', \
+                'import_core', 'import_all']
+
+
+
+def lc_bench_setup(stage, tmpdir):
+
+    """ Set up a stage of lc_bench and return the function to time and the
+        number of points it processes """
+
+# -------- utilities
+    seed  = 111
+    medlc = lambda: lc_car_gen(seed, year=12., medres=1)
+    samp  = lambda: lc_sample(*medlc(), daily=1, season=1)
+    fname = os.path.join(tmpdir, stage)
+
+
+
+# -------- generation (refine: the 1 day curve refined to 0.01 day at the
+#          epochs of two visits a night)
+    if stage=='car_gen_refine':
+        tsamp = lc_cadence(daily=1, season=1, nvisit=2)
+        win   = np.transpose([tsamp, tsamp])
+        gen   = lambda: lc_refine(*lc_car_gen(seed, year=12., lores=1), \
+                                      windows=win, seed=seed)
+
+        return gen, gen()[0].size
+
+    if stage.startswith('car_gen'):
+        opts = {'car_gen_lores':{'lores':1}, 'car_gen_medres':{'medres':1}, \
+                    'car_gen_hires':{}, 'car_gen_fft':{'fft':1}}[stage]
+        npts = lc_car_gen(seed, year=12., **opts)[0].size
+
+        return lambda: lc_car_gen(seed, year=12., **opts), npts
+
+
+
+# -------- sampling (without, and with the cache of cadence indices) and
+#          noise
+    if stage.startswith('sample'):
+        time, lc = medlc()
+        flag     = stage.split('_')[1]
+        opts     = {} if flag in ['all', 'cached'] else {flag:1}
+
+        if flag=='cached': opts = {'daily':1, 'season':1}
+        else: lc_sample_cache(nmax=0)
+
+        return lambda: lc_sample(time, lc, **opts), time.size
+
+    if stage=='noise':
+        time, lc = samp()
+
+        return lambda: lc_noise(lc, 222), lc.size
+
+
+
+# -------- splines
+    if stage=='spline':
+        time, lc = samp()
+        xgrid    = medlc()[0]
+
+        return lambda: lc_spline(time, lc, xr=[xgrid[0], xgrid[-1]], \
+                                     nx=xgrid.size), xgrid.size
+
+    if stage=='spline_season':
+        time, lc = samp()
+
+        return lambda: lc_spline_season(time, lc), time.size
+
+
+
+# -------- time delays (on a copy, since the curve is modified)
+    if stage.startswith('add_tdelay'):
+        time, lc = medlc()
+        opts     = {'subgrid':'bridge', 'seed':seed} if \
+            stage.endswith('bridge') else {}
+        tdelay   = 14.75 if opts else 14.7
+
+        return lambda: lc_add_tdelay(time, lc.copy(), tdelay, **opts), \
+            lc.size
+
+
+
+# -------- writing and reading
+    if stage.startswith('write_good') or stage.startswith('read_good'):
+        time, lc = samp()
+        ascii    = stage.endswith('ascii') or None
+        fname   += '.txt' if ascii else '.fits'
+        write    = lambda: lc_write(time, [lc, lc], 'good', fname, \
+                                        clobber=1, ascii=ascii)
+
+        if stage.startswith('write'): return write, 2*time.size
+
+        write()
+        read = (lambda: np.loadtxt(fname, comments='#')) if ascii else \
+            (lambda: fits.getdata(fname).time[0])
+
+        return read, 2*time.size
+
+    if stage.startswith('write_evil') or stage.startswith('read_evil'):
+        lc = lightcurve(seed, 222)
+        lc.car_gen(medres=1)
+        lc.sample(daily=1, season=1)
+        npts   = lc.time.size + lc.lc_buff.size
+
+        # fits, or archive (compressed if _z) in chunks of ~2 years
+        if 'archive' in stage or 'window' in stage:
+            fname   += '.lca'
+            compress = stage.endswith('_z') or 'window' in stage or None
+            write    = lambda: lc_archive_write([], lc, 'evil', fname, \
+                                                    clobber=1, chunk=8192, \
+                                                    compress=compress)
+        else:
+            fname += '.fits'
+            write  = lambda: lc.write(fname, clobber=1)
+
+        if stage.startswith('write'): return write, npts
+
+        write()
+        if stage.endswith('lazy'):
+            return lambda: lc_read(fname, columns=['tau', 'tdelay']), 2
+
+        if stage.endswith('window'):
+            nwin = ((lc.time >= 1000.) & (lc.time <= 1100.)).sum()
+
+            return lambda: lc_archive(fname).window(1000., 1100.), nwin
+
+        return lambda: lc_read(fname), npts
+
+
+# -------- imports (timed in a fresh interpreter, see lc_bench_stage)
+    if stage.startswith('import'):
+        package = __name__.rpartition('.')[0] or __package__
+        modules = {'import_package':[package.split('.')[0]], \
+                       'import_core':[package + '.lc_car_gen', \
+                                          package + '.lc_noise'], \
+                       'import_all':['from ' + package + ' import *']}[stage]
+
+        return (lambda: lc_bench_import(modules)), len(modules)
+
+
+    raise ValueError("LC_BENCH: unknown stage {0}".format(stage))
+
+
+
+def lc_bench_stage(stage, nrep, tmpdir):
+
+    """ Run one stage of lc_bench (in a worker process) and return its
+        timing and memory use """
+
+# -------- set up the stage quietly
+    stdout     = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        func, npts = lc_bench_setup(stage, tmpdir)
+        rss0       = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # imports are timed by the fresh interpreter (fastest of nrep)
+        if stage.startswith('import'):
+            secs = [func() for irep in range(nrep)]
+        else:
+            # calls per repetition, so that a repetition takes >~ 0.2 s
+            start = tm.time()
+            func()
+            nloop = max(1, int(0.2/max(tm.time() - start, 1e-6)))
+
+            # time the stage (fastest of nrep)
+            secs = []
+            for irep in range(nrep):
+                start = tm.time()
+                for iloop in range(nloop): func()
+                secs.append((tm.time() - start)/nloop)
+
+        rss1 = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # size of the file (or archive) written or read by the stage
+        size = 0
+        for fname in glob.glob(os.path.join(tmpdir, stage) + '.*'):
+            for root, dirs, files in os.walk(fname):
+                size += sum(os.path.getsize(os.path.join(root, ifile)) for \
+                                ifile in files)
+            if os.path.isfile(fname): size += os.path.getsize(fname)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+
+# -------- return the results (ru_maxrss is in kB on linux, B on mac)
+    kb = 1024.**2 if sys.platform=='darwin' else 1024.
+
+
+    return {'seconds':min(secs), 'peak_mb':rss1/kb, \
+                'delta_mb':(rss1 - rss0)/kb, 'npts':npts, \
+                'pts_per_s':npts/max(min(secs), 1e-9), \
+                'file_mb':size/1024.**2}
+
+
+
+def lc_bench_import(modules):
+
+    """ Return the time [s] taken to import modules (names, or import
+        statements) in a fresh interpreter, beyond the import of numpy """
+
+    stmts = [imod if ' ' in imod else 'import ' + imod for imod in modules]
+    code  = "import time, numpy\nstart = time.time()\n" + \
+        "\n".join(stmts) + "\nprint time.time() - start\n"
+    env   = dict(os.environ, PYTHONPATH=os.pathsep.join([ipath for ipath in \
+                                                              sys.path if \
+                                                              ipath]))
+
+    return float(subprocess.check_output([sys.executable, '-c', code], \
+                                             env=env).split()[-1])
+
+
+
+if __name__=='__main__':
+    lc_bench(baseline=sys.argv[1] if len(sys.argv) > 1 else None, \
+                 save=sys.argv[2] if len(sys.argv) > 2 else None)
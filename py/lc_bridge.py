@@ -0,0 +1,131 @@
+import numpy as np
+from lc_rng import *
+
+def lc_bridge(time, lc, tnew, meanmag=None, tau=None, sigma=None, seed=None, \
+                  rng=None):
+
+    """
+    NAME:
+      lc_bridge
+
+    PURPOSE:
+      Draw the values of a CAR(1) (Ornstein-Uhlenbeck) light curve at new
+      times conditional on a known realization of the same light curve,
+      i.e., sample the exact Ornstein-Uhlenbeck bridge between the known
+      points.
+
+    CALLING SEQUENCE:
+      lcnew = lc_bridge(time, lc, tnew, meanmag=, tau=, sigma=, seed=, rng=)
+
+    INPUTS:
+      time - increasing times of the known realization [day]
+      lc   - known realization [mag]
+      tnew - times at which to draw the light curve [day]
+
+    OPTIONAL INPUTS:
+      meanmag - mean magnitude of the light curve (default 20)
+      tau     - characteristic time scale (default 10^2.5 day)
+      sigma   - characteristic fluctuation amp (default 8d-3 mag day^-1/2)
+      seed    - the seed for the random draws (the 'bridge' stream, see
+                lc_rng)
+      rng     - a numpy Generator (or RandomState) to draw from instead of
+                the generator derived from seed
+
+    KEYWORDS:
+
+    OUTPUTS:
+      lcnew - light curve at tnew [mag]
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+
+    COMMENTS:
+      With z = lc - meanmag, a new point at s between known (or already
+      drawn) points (tl, zl) and (tr, zr) is Gaussian with
+        mean = (a1 v2 zl + a2 v1 zr) / (v2 + a2^2 v1)
+        var  = v1 v2 / (v2 + a2^2 v1)
+      where a1 = exp(-(s-tl)/tau), a2 = exp(-(tr-s)/tau), and
+      v = sigma^2 tau/2 (1 - a^2).  Points before the first (after the
+      last) known time are drawn from the one-sided transition.  Several
+      new points in the same interval are drawn in order of time, each
+      conditional on the previous one (Markov property), so the result
+      is an exact joint draw.  Values at tnew equal to a known time are
+      copied.  The work is O(N) and vectorized across intervals.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - Draws from a generator of its own (see lc_rng)
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    meanmag = 20.0 if meanmag==None else meanmag
+    tau     = 10.**2.5 if tau==None else tau
+    sigma   = 8e-3 if sigma==None else sigma
+
+
+
+# -------- utilities
+    time  = np.asarray(time, dtype=float)
+    zlc   = np.asarray(lc, dtype=float) - meanmag
+    tnew  = np.atleast_1d(np.asarray(tnew, dtype=float))
+    order = np.argsort(tnew, kind='mergesort')
+    tsrt  = tnew[order]
+    ntime = time.size
+    nnew  = tsrt.size
+
+    def var(dt): return 0.5*sigma**2*tau*(1.0 - np.exp(-2.0*dt/tau))
+
+
+
+# -------- locate the new points and their rank within each interval
+    iright = np.searchsorted(time, tsrt, side='left')
+    exact  = (iright < ntime) & (time[np.minimum(iright, ntime-1)] == tsrt)
+    first  = np.concatenate([[True], iright[1:] != iright[:-1]])
+    start  = np.maximum.accumulate(np.where(first, np.arange(nnew), 0))
+    rank   = np.arange(nnew) - start
+
+
+
+# -------- draw the new points in order within each interval
+    rand = lc_rng(seed, 'bridge', rng=rng).standard_normal(nnew)
+    znew = np.zeros(nnew)
+
+    for irank in range(rank.max() + 1 if nnew else 0):
+        ind = np.where(rank == irank)[0]
+        ilt = iright[ind] - 1
+        irt = np.minimum(iright[ind], ntime-1)
+
+        # left point: the previous new point or the known point
+        tl = np.where(irank > 0, tsrt[ind-1], time[np.maximum(ilt, 0)])
+        zl = np.where(irank > 0, znew[ind-1], zlc[np.maximum(ilt, 0)])
+        hasl = (irank > 0) | (ilt >= 0)
+        hasr = iright[ind] < ntime
+
+        # transition variances and decays
+        d1 = np.where(hasl, tsrt[ind] - tl, 0.0)
+        d2 = np.where(hasr, time[irt] - tsrt[ind], 0.0)
+        a1 = np.exp(-d1/tau)
+        a2 = np.exp(-d2/tau)
+        v1 = var(d1)
+        v2 = var(d2)
+
+        # bridge (both sides) or one-sided transition
+        den  = np.where(hasl & hasr, v2 + a2**2*v1, 1.0)
+        mean = np.where(hasl & hasr, (a1*v2*zl + a2*v1*zlc[irt])/den, \
+                            np.where(hasl, a1*zl, a2*zlc[irt]))
+        vari = np.where(hasl & hasr, v1*v2/den, np.where(hasl, v1, v2))
+
+        znew[ind] = mean + np.sqrt(np.maximum(vari, 0.0))*rand[ind]
+
+
+
+# -------- copy exact matches, restore the input order and return
+    znew[exact] = zlc[iright[exact]]
+
+    lcnew        = np.empty(nnew)
+    lcnew[order] = znew + meanmag
+
+    return lcnew
@@ -0,0 +1,207 @@
+import numpy as np
+import os
+import re
+import glob
+import hashlib
+from collections import OrderedDict
+
+class lc_cache(object):
+
+    """
+      Content addressed cache of intrinsic light curves (time, lc) with
+      an on-disk tier of memory-mappable .npy files and an in-process tier
+      for the most recently used entries.  Both tiers are evicted in
+      least recently used order.
+
+        path     - directory of the disk tier (created if needed)
+        maxbytes - size budget of the disk tier (default 1 GB)
+        nmem     - number of entries in the memory tier (default 8)
+
+      Entries are keyed by lc_cache.key(...) of the lc_car_gen parameters
+      and are returned read-only; copy before modifying.  Only the files
+      of the cache (<key>_time.npy and <key>_lc.npy) are ever removed
+      from path.
+    """
+
+# -------- initialize the cache
+    def __init__(self, path, maxbytes=None, nmem=None):
+
+        """ Initialize the cache """
+
+        self.path     = os.path.join(path, '')
+        self.maxbytes = maxbytes if maxbytes else 2L**30
+        self.nmem     = nmem if nmem!=None else 8
+        self.memory   = OrderedDict()
+
+        if not os.path.isdir(self.path): os.makedirs(self.path)
+
+
+# -------- return the hash of a set of generation parameters
+    @staticmethod
+    def key(*params):
+
+        """ Return the hash of a set of generation parameters (arrays are
+            hashed by value and numbers as floats, so that e.g. 20, 20L and
+            20.0 give the same key) """
+
+        hsh = hashlib.sha1()
+
+        for par in params:
+            if isinstance(par, np.generic): par = par.item()
+
+            if isinstance(par, np.ndarray):
+                hsh.update(np.ascontiguousarray(par, dtype=float).tostring())
+            elif isinstance(par, (int, long, float)):
+                hsh.update(repr(float(par)))
+            else:
+                hsh.update(repr(par))
+            hsh.update('|')
+
+        return hsh.hexdigest()
+
+
+# -------- get an entry
+    def get(self, key):
+
+        """ Return (time, lc) for key or None if it is not cached """
+
+        files = [self.path + key + '_time.npy', self.path + key + '_lc.npy']
+
+        # memory tier (the disk files are touched as well, so that the
+        # entry stays recently used for the eviction of the disk tier)
+        if key in self.memory:
+            entry = self.memory.pop(key)
+            self.memory[key] = entry
+
+            try:
+                for ifile in files: os.utime(ifile, None)
+            except OSError:
+                pass
+
+            return entry
+
+        # disk tier
+        try:
+            entry = tuple(np.load(ifile, mmap_mode='r') for ifile in files)
+            for ifile in files: os.utime(ifile, None)
+        except (IOError, OSError, ValueError):
+            return None
+
+        self._remember(key, entry)
+
+        return entry
+
+
+# -------- put an entry
+    def put(self, key, time, lc):
+
+        """ Store (time, lc) under key and return read-only views of them """
+
+        # write each array to a temporary file and rename (atomic, so that
+        # concurrent workers never see partial files)
+        for name, arr in [('_time', time), ('_lc', lc)]:
+            tmp = '{0}{1}{2}.{3}.tmp.npy'.format(self.path, key, name, \
+                                                     os.getpid())
+            np.save(tmp, arr)
+            os.rename(tmp, self.path + key + name + '.npy')
+
+        time = time.view()
+        lc   = lc.view()
+        time.flags.writeable = lc.flags.writeable = False
+
+        self._remember(key, (time, lc))
+        self.evict()
+
+        return time, lc
+
+
+# -------- evict disk entries down to the size budget
+    def evict(self):
+
+        """ Remove least recently used disk entries until the disk tier is
+            within maxbytes """
+
+        files = []
+
+        for key in self.keys():
+            ifile = self.path + key + '_lc.npy'
+            try:
+                size  = os.path.getsize(ifile) + \
+                    os.path.getsize(self.path + key + '_time.npy')
+                atime = os.path.getmtime(ifile)
+            except OSError:
+                continue
+            files.append((atime, size, key))
+
+        files.sort()
+        total = sum([ifile[1] for ifile in files])
+
+        for atime, size, key in files:
+            if total <= self.maxbytes: break
+
+            for name in ['_lc.npy', '_time.npy']:
+                try:
+                    os.remove(self.path + key + name)
+                except OSError:
+                    pass
+
+            self.memory.pop(key, None)
+            total -= size
+
+
+# -------- empty both tiers
+    def clear(self):
+
+        """ Empty both the memory and disk tiers """
+
+        self.memory.clear()
+
+        for key in self.keys():
+            for name in ['_lc.npy', '_time.npy']:
+                try:
+                    os.remove(self.path + key + name)
+                except OSError:
+                    pass
+
+
+# -------- keys of the disk tier
+    def keys(self):
+
+        """ Return the keys of the entries of the disk tier (the
+            <key>_lc.npy files of path with a key of lc_cache.key) """
+
+        return [os.path.basename(ifile)[:-7] for ifile in \
+                    glob.glob(self.path + '*_lc.npy') if \
+                    re.match('^[0-9a-f]{40}_lc\\.npy$', \
+                                 os.path.basename(ifile))]
+
+
+# -------- add an entry to the memory tier
+    def _remember(self, key, entry):
+
+        """ Add an entry to the memory tier, evicting the oldest """
+
+        if self.nmem < 1: return
+
+        self.memory[key] = entry
+
+        while len(self.memory) > self.nmem: self.memory.popitem(last=False)
+
+
+# -------- pickle without the memory tier (for worker processes)
+    def __getstate__(self):
+
+        """ Pickle without the memory tier """
+
+        state           = self.__dict__.copy()
+        state['memory'] = OrderedDict()
+
+        return state
+
+
+# -------- copies of lightcurve instances share the cache
+    def __deepcopy__(self, memo):
+
+        """ Return self (copies of lightcurve instances share the cache) """
+
+        return self
@@ -0,0 +1,90 @@
+import numpy as np
+
+def lc_cadence(daily=None, weekly=None, season=None, tmax=None, sealen=None, \
+                   seagap=None, nyear=None, nvisit=None, dvisit=None, \
+                   tmin=None):
+
+    """
+    NAME:
+      lc_cadence
+
+    PURPOSE:
+      Return the observing epochs of a cadence without reference to an
+      intrinsic time grid.  The epochs are those which lc_sample would
+      select from a grid that contains them.
+
+    CALLING SEQUENCE:
+      tsamp = lc_cadence(daily=, weekly=, season=, tmax=, sealen=, seagap=,
+                         nyear=, nvisit=, dvisit=, tmin=)
+
+    INPUTS:
+
+    OPTIONAL INPUTS:
+      tmax   - epochs are in the range [0,tmax) days (default nyear years
+               of sealen+seagap days, or 3650)
+      sealen - length of an observing season in days (default 120)
+      seagap - gap between seasons in days (default 365-sealen)
+      nyear  - number of years (seasons) of observations
+      nvisit - number of visits per night (default 1)
+      dvisit - time between visits in a night in days (default 1 hour)
+      tmin   - only return the epochs >= tmin (e.g. for a chunk of a long
+               curve, the cost then scales with tmax-tmin)
+
+    KEYWORDS:
+      daily  - daily sampling (the default if weekly is not set)
+      weekly - weekly (7 dy) sampling
+      season - include season gap (sealen days on, seagap days off)
+
+    OUTPUTS:
+      tsamp - epochs in days (increasing)
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      daily cadence, 3 visits a night, 150 day seasons for 5 years:
+      tsamp = lc_cadence(season=1, sealen=150., nyear=5, nvisit=3)
+
+    COMMENTS:
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - Added season length, gap, years and visits per night
+      2026/10/17 - Added tmin
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    sealen = 120. if sealen==None else sealen
+    seagap = 365. - sealen if seagap==None else seagap
+    nvisit = 1 if nvisit==None else nvisit
+    dvisit = 1./24. if dvisit==None else dvisit
+
+    if tmax==None:
+        tmax = 3650. if nyear==None else nyear*(sealen + seagap)
+
+
+
+# -------- sampling (from the first night with a visit at or after tmin)
+    step  = 7.0 if (weekly and not daily) else 1.0
+    start = 0.0 if tmin==None else \
+        step*max(np.ceil((tmin - (nvisit - 1)*dvisit)/step), 0.0)
+    tsamp = np.arange(start, tmax, step)
+
+
+
+# -------- create season gap (seasons are sealen days on, seagap days off)
+    if season:
+        tsamp = tsamp[tsamp % (sealen + seagap) < sealen]
+
+
+
+# -------- multiple visits per night
+    if nvisit > 1:
+        tsamp = (tsamp[:,np.newaxis] + dvisit*np.arange(nvisit)).ravel()
+        tsamp = tsamp[tsamp < tmax]
+
+    if tmin!=None: tsamp = tsamp[tsamp >= tmin]
+
+
+    return tsamp
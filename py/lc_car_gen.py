@@ -1,8 +1,13 @@
 import numpy as np
-import sys
+from lc_metrics import *
+from lc_rng import *
+from lc_lazy import *
+
+signal = lc_lazy('scipy.signal')
 
 def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
-                   sigma=None, lores=None, medres=None):
+                   sigma=None, lores=None, medres=None, reference=None, \
+                   fft=None, pad=None, tsamp=None, cache=None, rng=None):
     """
     NAME:
       lc_car_gen
@@ -13,10 +18,11 @@ def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
       (note: error in Kelly et al FIG 1 label [mag^2 day^-1] -> [mag^2 day])
     
      CALLING SEQUENCE:
-      lc = lc_car_gen(seed, meanmag=, mag0=, year=, tau=, sigma=, lores=)
+      lc = lc_car_gen(seed, meanmag=, mag0=, year=, tau=, sigma=, lores=, 
+                      medres=, reference=, fft=, pad=, tsamp=, cache=, rng=)
     
      INPUTS:
-      seed - the seed for the random phase
+      seed - the seed for the random phase (see lc_rng)
     
      OPTIONAL INPUTS:
       meanmag - mean magnitude of the light curve (default 20)
@@ -24,10 +30,25 @@ def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
       year    - number of years to run the light curve (default 10)
       tau     - characteristic time scale (default 10^2.5 day)
       sigma   - characteristic fluctuation amp (default 8d-3 mag day^-1/2) 
+      pad     - factor by which the FFT grid is longer than the light curve
+                (fft only, default max(2, 1 + 10*tau/duration), rounded up
+                to a power of two)
+      tsamp   - increasing times [day] at which to generate the light curve
+                instead of a uniform grid (year, lores and medres ignored)
+      cache   - an lc_cache instance; if the light curve for this set of
+                parameters has been generated before it is returned from
+                the cache (read-only), otherwise it is generated and stored
+                (not used if rng is input)
+      rng     - a numpy Generator (or RandomState) to draw from instead of
+                the generator derived from seed
     
      KEYWORDS:
-      lores  - use 1.0 dy sampling instead of 0.01 dy
-      medres - use 0.1 dy sampling instead of 0.01 dy
+      lores     - use 1.0 dy sampling instead of 0.01 dy
+      medres    - use 0.1 dy sampling instead of 0.01 dy
+      reference - use the original O(N^2) summation of equation (A3) 
+                  instead of the O(N) recursion (for checking only)
+      fft       - draw the power spectrum of the process in Fourier space
+                  and inverse FFT onto the grid (Timmer & Koenig 1995)
     
      OUTPUTS:
       time - in days
@@ -39,17 +60,50 @@ def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
     
      COMMENTS:
       Uses the continuous auto regressive, CAR(1), method outlined in
-      Kelly et al (2009)
+      Kelly et al (2009).  The sum in equation (A3) obeys the one-step
+      recursion y[i] = exp(-dt/tau)*(y[i-1] + rf[i-1]), which is applied
+      as a linear filter so that the cost is O(N) instead of O(N^2).  For
+      the same seed the two modes agree to round-off, except that the
+      reference summation leaves the final time step at the mean.
+
+      With fft set, the exact power spectrum of the same discrete process,
+      sigma^2 a^2 / (1 - 2 a cos(w) + a^2) with a = exp(-dt/tau), is drawn
+      with Gaussian real and imaginary parts on a padded grid, so the cost
+      is O(N log N).  Without padding the periodic FFT ties the two ends
+      of the curve together and removes power on scales longer than the
+      duration; the default pad keeps the padded span > 10 tau beyond
+      the end of the curve.  The stationary realization y is started
+      from mag0 as y - y[0]*exp(-t/tau), which has the same distribution
+      as the CAR process started at y=0.  For a given seed the fft
+      realization is statistically, not sample-by-sample, equivalent to
+      the CAR one.
+
+      With tsamp set, the process is generated only at the requested
+      times using the exact transition of the Ornstein-Uhlenbeck process
+      between successive (possibly irregular) times,
+        y[k] = a[k] y[k-1] + sqrt(sigma^2 tau/2 (1 - a[k]^2)) N(0,1),
+      with a[k] = exp(-(tsamp[k]-tsamp[k-1])/tau) and y=0 at t=0, so the
+      work scales with the number of epochs rather than the duration.
+      Several delayed images of one source must be generated in a single
+      call at the union of their (shifted) epochs.
     
      REVISION HISTORY:
       2013/01/17 - converted from IDL by Greg Dobler (KITP/UCSB)
       2013/02/14 - modfied for hires run by default
+      2026/10/17 - O(N) recursive engine, old summation kept as reference
+      2026/10/17 - added spectral (fft) synthesis mode
+      2026/10/17 - added generation at irregular times (tsamp)
+      2026/10/17 - added cache keyword
+      2026/10/17 - status through lc_log, reference loop progress through
+                   lc_progress
+      2026/10/17 - draws from a generator of its own (see lc_rng), rng
+                   keyword
     
     ------------------------------------------------------------
     """
 
 # -------- Defaults
-    print 'LC_CAR_GEN: Using seed = ', seed
+    lc_log('LC_CAR_GEN: Using seed = ' + str(seed))
 
     if not meanmag : meanmag = 20.0
     if not mag0    : mag0    = meanmag
@@ -59,6 +113,47 @@ def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
 
 
 
+# -------- Return the cached light curve if available
+    if cache and rng is None:
+        # (keywords which do not change the curve are left out of the key)
+        resfac = 1L if lores else 10L if medres else 100L
+        grid   = (None, None, False, False, None) if tsamp is not None else \
+            (year, resfac, bool(reference and not fft), bool(fft), \
+                 pad if fft else None)
+        key    = cache.key(seed, meanmag, mag0, tau, sigma, tsamp, \
+                               lc_rng_legacy(), *grid)
+        entry  = cache.get(key)
+
+        if entry is not None: return entry
+
+        return cache.put(key, *lc_car_gen(seed, meanmag=meanmag, mag0=mag0, \
+                                              year=year, tau=tau, sigma=sigma, \
+                                              lores=lores, medres=medres, \
+                                              reference=reference, fft=fft, \
+                                              pad=pad, tsamp=tsamp))
+
+
+# -------- Generate exactly at the input times if desired
+    gen = lc_rng(seed, 'curve', rng=rng)
+
+    if tsamp is not None:
+        time  = np.asarray(tsamp, dtype=float)
+        decay = np.exp(-np.diff(np.concatenate([[0.0], time]))/tau)
+        rf    = sigma*np.sqrt(0.5*tau*(1.0 - decay**2)) * \
+            gen.standard_normal(time.size)
+        ylc   = np.zeros(time.size)
+
+        ylast = 0.0
+        for itime in range(time.size):
+            ylast       = decay[itime]*ylast + rf[itime]
+            ylc[itime] = ylast
+
+        lc = mag0*np.exp(-time/tau) + meanmag*(1.0 - np.exp(-time/tau)) + ylc
+
+        return time, lc
+
+
+
 # -------- Define the time vector for the lightcurve and initialize
     resfac = 1L if lores else 10L if medres else 100L
 
@@ -74,24 +169,55 @@ def lc_car_gen(seed, meanmag=None, mag0=None, year=None, tau=None, \
 
 
 
+# -------- Make the light curve in Fourier space if desired
+    if fft:
+        if not pad: pad = max(2.0, 1.0 + 10.0*tau/duration)
+
+        nfft  = 2L**long(np.ceil(np.log2(pad*duration)))
+        nfrq  = nfft//2 + 1
+        decay = np.exp(-1.0/tau)
+        omega = 2.0*np.pi*np.arange(nfrq)/nfft
+        psd   = sigma**2*decay**2/(1.0 - 2.0*decay*np.cos(omega) + decay**2)
+
+        amp       = np.sqrt(0.5*nfft*psd)
+        ftlc      = amp*(gen.standard_normal(nfrq) + \
+                         1j*gen.standard_normal(nfrq))
+        ftlc[0]   = np.sqrt(2.0)*ftlc[0].real
+        ftlc[-1]  = np.sqrt(2.0)*amp[-1]*gen.standard_normal()
+
+        ylc = np.fft.irfft(ftlc, nfft)[:duration]
+        lc  = mag0*np.exp(-time/tau) + meanmag*(1.0 - np.exp(-time/tau)) + \
+            ylc - ylc[0]*np.exp(-time/tau)
+
+        time /= float(resfac)
+
+        return time, lc
+
+
+
 # -------- Make the using equation (A3)
-    np.random.seed(seed)
 
     dt  = time[1] - time[0]
-    dBs = dt*np.random.randn(duration)
+    dBs = dt*gen.standard_normal(duration)
     dtj = np.arange(duration-1,0,-1.)
     rf  = sigma*dBs
 
     lc  = mag0*np.exp(-time/tau) + meanmag*(1.0 - np.exp(-time/tau))
 
+    if not reference:
+        decay = np.exp(-dt/tau)
+        lc   += signal.lfilter([0.0, decay], [1.0, -decay], rf)
+        time /= float(resfac)
+
+        return time, lc
+
     for itime in range(1,duration-1,1):
-        if itime % 1000 == 0 : 
-            print 'LC_CAR_GEN: {0} steps out of {1}\r'.format(itime,duration),
-            sys.stdout.flush()
+        if itime % 1000 == 0 : lc_progress('lc_car_gen', itime, duration)
 
         lc[itime] += np.add.reduce(rf[0:itime] * \
                                 np.exp(-dtj[duration-1-itime:duration-1]/tau))
-    print
+
+    lc_progress('lc_car_gen', duration, duration)
 
 
 
@@ -0,0 +1,150 @@
+import numpy as np
+from lc_metrics import *
+from lc_rng import *
+
+def lc_car_gen_batch(seeds, meanmag=None, mag0=None, year=None, tau=None, \
+                         sigma=None, lores=None, medres=None, nblock=None):
+    """
+    NAME:
+      lc_car_gen_batch
+
+    PURPOSE:
+      Generate a stack of mock light curves on a common time grid, one per
+      input seed, using the same CAR(1) process as lc_car_gen.
+
+    CALLING SEQUENCE:
+      time, lcs = lc_car_gen_batch(seeds, meanmag=, mag0=, year=, tau=,
+                                   sigma=, lores=, medres=, nblock=)
+
+    INPUTS:
+      seeds - vector of seeds for the random phases (one per light curve)
+
+    OPTIONAL INPUTS:
+      meanmag - mean magnitude, scalar or one per seed (default 20)
+      mag0    - magnitude at t=0, scalar or one per seed (default meanmag)
+      year    - number of years to run the light curves (default 10)
+      tau     - characteristic time scale, scalar or one per seed
+                (default 10^2.5 day)
+      sigma   - characteristic fluctuation amp, scalar or one per seed
+                (default 8d-3 mag day^-1/2)
+      nblock  - number of time steps processed at once (default such that
+                a block holds 2^20 values, at least 64 steps)
+
+    KEYWORDS:
+      lores  - use 1.0 dy sampling instead of 0.01 dy
+      medres - use 0.1 dy sampling instead of 0.01 dy
+
+    OUTPUTS:
+      time - in days
+      lcs  - light curves as a function of time [mag], shape (nseed, ntime)
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      time, lcs = lc_car_gen_batch(np.arange(1000), tau=10.**np.random.
+                                   uniform(1.5, 3.5, 1000), lores=1)
+
+    COMMENTS:
+      Row i is identical (to round-off) to lc_car_gen(seeds[i], ...) with
+      the corresponding row parameters.  The draws of each seed come from
+      a stream of their own and are written directly into the output
+      rows.  The recursion along the time axis is then applied to all
+      rows at once, each with its own decay exp(-dt/tau), block by block:
+      within a block of nblock steps it is an inclusive scan of log2
+      (nblock) array passes, and the last value of the block carries
+      over to the next one.  The cost is thus independent of how many
+      values of tau the ensemble has, and there are no per-row filter
+      calls.
+
+      Memory: besides the output (nseed x ntime float64, e.g. 2.9 GB
+      for 1000 curves of 10 yr at the default 0.01 dy resolution), a
+      few temporaries of nblock x nseed values (8 MB each by default)
+      are used.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - recursion vectorized across rows in time blocks
+
+    ------------------------------------------------------------
+    """
+
+# -------- Defaults
+    seeds = np.atleast_1d(seeds)
+    nseed = seeds.size
+
+    lc_log('LC_CAR_GEN_BATCH: Generating {0} light curves'.format(nseed))
+
+    ones    = np.ones(nseed)
+    meanmag = ones*(20.0 if meanmag is None else np.asarray(meanmag, float))
+    mag0    = meanmag if mag0 is None else ones*np.asarray(mag0, float)
+    year    = 10L if year is None else year
+    tau     = ones*(10.**2.5 if tau is None else np.asarray(tau, float))
+    sigma   = ones*(8e-3 if sigma is None else np.asarray(sigma, float))
+
+
+
+# -------- Define the time vector for the lightcurves and initialize
+    resfac = 1L if lores else 10L if medres else 100L
+
+    duration = long(365L*resfac*year) # [day/resfac]
+    time     = np.arange(0,duration,1.0)
+
+
+
+# -------- Convert tau and sigma
+    tau   = tau*float(resfac) # [day/resfac]
+    sigma = sigma/np.sqrt(float(resfac)) # [mag (day/resfac)^1/2]
+
+
+
+# -------- Draw the random phases (one stream per seed, as in lc_car_gen,
+#          stored in the output rows)
+    dt   = time[1] - time[0]
+    lcs  = np.empty([nseed, duration])
+    rfac = sigma*dt
+
+    for iseed in range(nseed):
+        lcs[iseed] = lc_rng(seeds[iseed], 'curve').standard_normal(duration)
+
+
+
+# -------- Make the light curves using the recursive form of equation (A3),
+#          y[n] = a (y[n-1] + rf[n-1]), block by block along the time axis
+    nblock = max(64L, 2L**20//nseed) if nblock is None else long(nblock)
+    decay  = np.exp(-dt/tau)
+    ylast  = np.zeros(nseed)
+    rlast  = np.zeros(nseed)
+
+    for it0 in range(0, duration, nblock):
+        it1 = min(it0 + nblock, duration)
+        nt  = it1 - it0
+
+        # inputs a rf[n-1] of the block, shape (nt, nseed)
+        rf       = np.empty([nt, nseed])
+        rf[0]    = rlast
+        rf[1:]   = lcs[:,it0:it1-1].T*rfac
+        rlast    = lcs[:,it1-1]*rfac
+        rf      *= decay
+
+        # inclusive scan of the recursion within the block (log2(nt)
+        # passes, each over all rows), then the carry of the last block
+        shift = 1
+        while shift < nt:
+            rf[shift:] += decay**shift*rf[:-shift]
+            shift      *= 2
+
+        rf   += decay**np.arange(1, nt+1)[:,np.newaxis]*ylast
+        ylast = rf[-1].copy()
+
+        # add the mean reversion from mag0 to meanmag
+        etau = np.exp(-time[it0:it1]/tau[:,np.newaxis])
+
+        lcs[:,it0:it1] = mag0[:,np.newaxis]*etau + \
+            meanmag[:,np.newaxis]*(1.0 - etau) + rf.T
+
+
+
+# -------- set time vector appropriately and return
+    time /= float(resfac)
+
+    return time, lcs
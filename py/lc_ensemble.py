@@ -0,0 +1,226 @@
+import numpy as np
+import time as tm
+import multiprocessing as mp
+from lc_system import *
+from lc_write import *
+from lc_goodfile import *
+from lc_metrics import *
+from lc_rng import *
+
+@lc_timed('lc_ensemble')
+def lc_ensemble(systems, path=None, prefix=None, nproc=None, lores=None, \
+                    medres=None, clobber=None, ascii=None, cache=None, \
+                    goodfile=None, subgrid=None):
+
+    """
+    NAME:
+      lc_ensemble
+
+    PURPOSE:
+      Build a set of lensed systems (e.g., a rung of the time delay
+      challenge) in parallel and write the 'good' and 'evil' files for
+      each system.
+
+    CALLING SEQUENCE:
+      timing = lc_ensemble(systems, path=, prefix=, nproc=, lores=, medres=,
+                           clobber=, ascii=, cache=, goodfile=, subgrid=)
+
+    INPUTS:
+      systems - table of system parameters, either a list of dicts or a
+                numpy record array, with fields
+                  seed, seed_n            (required)
+                  tau, sigma, meanmag,
+                  mag0, amp_n             (optional, lightcurve defaults)
+                  tdelay                  (optional, delays in days of up
+                                           to four images, default [0,0];
+                                           NaN entries are skipped)
+                  daily, weekly, season   (optional sampling flags)
+                  subgrid                 (optional, replaces the subgrid
+                                           keyword for this system)
+                  sysid                   (optional, default row number)
+
+    OPTIONAL INPUTS:
+      path   - path where files are written (default is present directory)
+      prefix - file name prefix (default 'tdc')
+      nproc  - number of worker processes (default is the number of cpus)
+      cache  - an lc_cache instance shared (on disk) by the workers, so
+               that re-running systems with new delays, cadences or noise
+               seeds skips the generation of the intrinsic curves
+      goodfile - name of a single multi-system 'good' file (see 
+                 lc_goodfile) to stream all systems into, in input order,
+                 instead of writing one 'good' file per system
+      subgrid  - method for delays that are not a multiple of the time
+                 resolution, 'bridge' or 'fourier' (see lc_system); a
+                 system with such a delay and no subgrid raises a
+                 ValueError before any of its files is written
+
+    KEYWORDS:
+      lores   - keep the 1 dy intrinsic curve from initialization
+      medres  - generate the intrinsic curve at 0.1 dy (default 0.01 dy)
+      clobber - flag to overwrite existing files
+      ascii   - flag to write the 'good' files in ascii instead of fits
+
+    OUTPUTS:
+      timing - list of (sysid, seconds) for each system, in input order
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      sys = [{'seed':1, 'seed_n':2, 'tau':300., 'tdelay':[0.,14.7]},
+             {'seed':3, 'seed_n':4, 'tdelay':[0.,-5.,21.,40.]}]
+      lc_ensemble(sys, path='rung0/', medres=1, clobber=1)
+      lc_ensemble(sys, path='rung0/', lores=1, subgrid='bridge', clobber=1)
+
+    COMMENTS:
+      Files are named <prefix>_<sysid>_good.fits (.txt if ascii) and
+      <prefix>_<sysid>_evil_<label>.fits with label = A, B, C, D.  Image k
+      of a system uses the noise seed seed_n + k.  Each system depends
+      only on its own row so the output does not depend on nproc or on
+      the order in which the workers finish (the workers use the random
+      streams of the caller, see lc_rng_legacy; lc_rng_spawn derives the
+      seeds of all systems from one master seed).  Progress is reported
+      to the progress callback (see lc_set_progress) as systems finish,
+      and if lc_ensemble runs within an lc_metrics record the stages timed in
+      the workers are merged into it.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - Workers follow the random stream mode of the caller
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    prefix = 'tdc' if prefix==None else prefix
+    nproc  = mp.cpu_count() if nproc==None else nproc
+
+    if isinstance(systems, np.ndarray):
+        systems = [dict(zip(systems.dtype.names, row)) for row in systems]
+
+    record = lc_metrics_active()
+    opts   = {'path':path, 'prefix':prefix, 'lores':lores, \
+                  'medres':medres, 'clobber':clobber, 'ascii':ascii, \
+                  'cache':cache, 'goodfile':goodfile, 'subgrid':subgrid, \
+                  'metrics':record is not None, 'legacy':lc_rng_legacy()}
+    args = [(isys, par, opts) for isys, par in enumerate(systems)]
+    nsys = len(args)
+
+    lc_log("LC_ENSEMBLE: building {0} systems on {1} processes".format(nsys, \
+                                                                      nproc))
+
+
+
+# -------- build the systems (in input order, so that systems can be
+#          streamed into a multi-system good file as they finish)
+    start  = tm.time()
+    timing = []
+    gfile  = lc_goodfile(goodfile, path=path, clobber=clobber) if goodfile \
+        else None
+
+    pool   = mp.Pool(nproc) if nproc > 1 else None
+
+    try:
+        if pool:
+            results = pool.imap(lc_ensemble_system, args, chunksize=1)
+        else:
+            results = (lc_ensemble_system(iarg) for iarg in args)
+
+        for sysid, systime, good, metrics in results:
+            if gfile: gfile.append(*good, sysid=sysid)
+            if metrics: record.merge(metrics)
+            timing.append((sysid, systime))
+            lc_progress('lc_ensemble', len(timing), nsys)
+
+    # stop the workers on error, and always close the pool and the
+    # container (which then holds the systems built so far)
+    except:
+        if pool: pool.terminate()
+        raise
+
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+        if gfile: gfile.close()
+
+    elapsed = tm.time() - start
+
+
+
+# -------- report timing and return
+    for sysid, systime in timing:
+        lc_log("LC_ENSEMBLE:   system {0}: {1:8.2f} s".format(sysid, systime))
+
+    lc_log("LC_ENSEMBLE: {0} systems in {1:.2f} s ({2:.2f} systems/s)" \
+               .format(nsys, elapsed, nsys/max(elapsed, 1e-12)))
+
+    return timing
+
+
+
+def lc_ensemble_system(args):
+
+    """ Build and write a single system of lc_ensemble (worker), with its
+        own metrics record if the caller of lc_ensemble has one """
+
+    if not args[2]['metrics']: return lc_ensemble_build(args) + (None,)
+
+    with lc_metrics() as met:
+        out = lc_ensemble_build(args)
+
+    return out + (met.as_dict(),)
+
+
+
+def lc_ensemble_build(args):
+
+    """ Build and write a single system of lc_ensemble """
+
+# -------- utilities
+    isys, par, opts = args
+    start = tm.time()
+
+    lc_rng_legacy(opts['legacy'])
+
+    sysid  = par.get('sysid', isys)
+    amp_n  = par.get('amp_n', None)
+    tdelay = np.atleast_1d(par.get('tdelay', [0.0, 0.0])).astype(float)
+    tdelay = tdelay[np.isfinite(tdelay)]
+    root   = '{0}_{1}'.format(opts['prefix'], sysid)
+
+
+
+# -------- generate the intrinsic light curve (shared by the images)
+    lcsys = lc_system(par['seed'], par['seed_n'], tdelay=tdelay, \
+                          subgrid=par.get('subgrid') or opts['subgrid'], \
+                          meanmag=par.get('meanmag'), mag0=par.get('mag0'), \
+                          tau=par.get('tau'), sigma=par.get('sigma'), \
+                          amp_n=amp_n, cache=opts['cache'])
+
+    if not opts['lores']: lcsys.car_gen(medres=opts['medres'])
+
+
+
+# -------- sample all images and write the evil files of each image
+    lcsys.sample(daily=par.get('daily'), weekly=par.get('weekly'), \
+                     season=par.get('season'))
+
+    for iimg in range(tdelay.size):
+        lcsys.image(iimg).write(root + '_evil_' + lcsys.label[iimg] + \
+                                    '.fits', path=opts['path'], \
+                                    clobber=opts['clobber'])
+
+    lcs    = list(lcsys.lc_samp + lcsys.noise)
+    errlcs = [lcsys.amp_n]*len(lcs)
+
+    if opts['goodfile']: return sysid, tm.time() - start, \
+            (lcsys.time_samp, lcs, errlcs)
+
+    lc_write(lcsys.time_samp, lcs, 'good', root + '_good' + \
+                 ('.txt' if opts['ascii'] else '.fits'), errlcs=errlcs, \
+                 path=opts['path'], clobber=opts['clobber'], \
+                 ascii=opts['ascii'])
+
+
+    return sysid, tm.time() - start, None
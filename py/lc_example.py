@@ -1,8 +1,10 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import copy as cp
 import SLTimeDelayChallenge as tdc
 
+# matplotlib is only imported when the first plot is made
+plt = tdc.lc_lazy('matplotlib.pyplot')
+
 """
 NAME:
   lc_example
@@ -86,8 +88,9 @@ print "  This initialization is just for illustrative purposes.  You "
 print "  certainly want a light curve with >1 day intrinsic resolution "
 print "  so use lc.car_gen().  By default this will produce a light curve "
 print "  (and reset lc.time and lc.lc) with a resolution of 0.01 day."
-print "  This generation takes about 30min.  For this example, we'll use "
-print "  medium resolution which should take about a minute... hang on."
+print "  This generation takes well under a second (the old O(N^2) "
+print "  summation, reference=1, took about 30min).  For this example, "
+print "  we'll use medium resolution."
 print "    lc.car_gen(medres=1)"
 print
 lc.car_gen(medres=1)
@@ -201,6 +204,27 @@ plt.ylim([20.75,21.75])
 plt.show()
 
 
+print
+print "  For a usable reconstruction, fit smoothing splines season by season "
+print "  (weighted by the noise amplitude) and evaluate them only where "
+print "  needed, e.g. at the sampled times (see lc_spline_season):"
+print "    lcA.spline(season=1)"
+print "    lcB.spline(season=1)"
+lcA.spline(season=1)
+lcB.spline(season=1)
+
+plt.plot(lcA.time_samp, lcA.lc_samp+lcA.noise, 'o')
+plt.plot(lcB.time_samp, lcB.lc_samp+lcB.noise, '*')
+plt.plot(lcA.time_sp, lcA.lc_sp, '.')
+plt.plot(lcB.time_sp, lcB.lc_sp, '.')
+plt.title(r'Example: seed = {0}, $\Delta t_B = 14.7$ day'.format(seed), \
+              fontsize=15)
+plt.xlabel('time [day]', fontsize=15)
+plt.ylabel('magnitude', fontsize=15)
+plt.ylim([20.75,21.75])
+plt.show()
+
+
 print
 print "  Last thing to do is write out some files.  'Evil' files are files "
 print "  containing lightcurve instances (i.e., including all the meta data) "
@@ -0,0 +1,229 @@
+import numpy as np
+import os
+import io
+from lc_write import *
+from lc_metrics import *
+from lc_lazy import *
+
+fits = lc_lazy('pyfits')
+
+class lc_goodfile(object):
+
+    """
+      Container that streams many systems in the 'good' file convention
+      into a single fits file.  Each system is one binary table HDU with
+      the columns of a 'good' file (time, lc_A, ..., err_A, ... in
+      nanomaggies, see lc_good_table) and the header keyword SYSID, and
+      is written to disk as soon as it is appended, so memory does not
+      grow with the number of systems.  close() appends an INDEX table
+      (sysid, hdu, offset, nimage, npts, with the byte offset of each
+      system HDU) as the last HDU and records its byte offset in the
+      primary header keyword TDCINDX.
+
+        gf = lc_goodfile('rung0_good.fits', clobber=1)
+        gf.append(time, [lcA, lcB], errlcs=[0.03, 0.03], sysid=17)
+        ...
+        gf.close()
+
+      Systems are read back with lc_goodfile_read.
+    """
+
+# -------- open the container
+    def __init__(self, filename, path=None, clobber=None):
+
+        """ Open the container and write the primary header """
+
+        out = (path if path else '') + filename
+
+        if os.path.exists(out) and not clobber:
+            raise IOError("LC_GOODFILE: file {0} exists " \
+                              "(use clobber=1)".format(out))
+
+        lc_log("LC_GOODFILE: Streaming light curves to file " + out)
+
+        self.filename = out
+        self.sysid    = []
+        self.nimage   = []
+        self.npts     = []
+        self.offset   = []
+        self.fout     = open(out, 'wb')
+
+        self.fout.write(self.header(0).tostring())
+
+
+# -------- primary header
+    def header(self, offset):
+
+        """ Return the primary header with the byte offset of the INDEX
+            table (0 until the container is closed) """
+
+        phdu = fits.PrimaryHDU()
+        phdu.header['TDCCONT'] = ('good', 'multi-system good file')
+        phdu.header['TDCINDX'] = (offset, 'byte offset of the INDEX table')
+
+        return phdu.header
+
+
+# -------- append a system
+    @lc_timed('lc_goodfile.append')
+    def append(self, time, lcs, errlcs=None, sysid=None):
+
+        """ Append a system of up to four sampled lightcurves [mag] with
+            errors in % of flux (default 3%) """
+
+        # utilities
+        if not isinstance(lcs, list): lcs = [lcs]
+
+        if len(lcs) > 4:
+            raise ValueError("LC_GOODFILE: number of lightcurves per " \
+                                 "system cannot exceed four.")
+
+        sysid = len(self.sysid) if sysid==None else sysid
+
+        # create the table (as in a 'good' file) and tag it
+        table_hdu = lc_good_table(time, lcs, errlcs=errlcs)
+        table_hdu.header['SYSID'] = (str(sysid), 'system identifier')
+
+        # serialize the HDU and append its bytes (skipping the primary
+        # header which fits requires to serialize an HDU list)
+        phdu = fits.PrimaryHDU()
+        buf  = io.BytesIO()
+
+        fits.HDUList([phdu, table_hdu]).writeto(buf)
+
+        # record the system in the index (at the offset of its HDU)
+        self.offset.append(self.fout.tell())
+        self.fout.write(buf.getvalue()[len(phdu.header.tostring()):])
+
+        self.sysid.append(str(sysid))
+        self.nimage.append(len(lcs))
+        self.npts.append(lcs[0].size)
+
+
+# -------- write the index and close
+    def close(self):
+
+        """ Append the INDEX table and close the file """
+
+        if self.fout.closed: return
+
+        nsys = len(self.sysid)
+        slen = max([len(isys) for isys in self.sysid] + [1])
+
+        col = [ \
+            fits.Column(name='sysid',  format=str(slen)+'A', \
+                            array=np.array(self.sysid, dtype='S'+str(slen))), \
+            fits.Column(name='hdu',    format='J', \
+                            array=np.arange(1, nsys+1)), \
+            fits.Column(name='offset', format='K', \
+                            array=np.array(self.offset, dtype=np.int64)), \
+            fits.Column(name='nimage', format='J', \
+                            array=np.array(self.nimage)), \
+            fits.Column(name='npts',   format='J', \
+                            array=np.array(self.npts)) \
+            ]
+
+        index_hdu      = fits.new_table(col)
+        index_hdu.name = 'INDEX'
+
+        phdu = fits.PrimaryHDU()
+        buf  = io.BytesIO()
+
+        fits.HDUList([phdu, index_hdu]).writeto(buf)
+
+        offset = self.fout.tell()
+        self.fout.write(buf.getvalue()[len(phdu.header.tostring()):])
+
+        # record the offset of the index in the primary header (of the
+        # same size, so it is rewritten in place)
+        self.fout.seek(0)
+        self.fout.write(self.header(offset).tostring())
+        self.fout.close()
+
+        lc_log("LC_GOODFILE: wrote {0} systems to {1}".format(nsys, \
+                                                                self.filename))
+
+
+# -------- context manager
+    def __enter__(self):
+
+        """ Enter a with block """
+
+        return self
+
+    def __exit__(self, *args):
+
+        """ Close the file at the end of a with block """
+
+        self.close()
+
+
+
+def lc_goodfile_read(filename, sysid=None, path=None):
+
+    """
+    NAME:
+      lc_goodfile_read
+
+    PURPOSE:
+      Read the index or one system of a multi-system 'good' file written
+      by lc_goodfile.
+
+    CALLING SEQUENCE:
+      index = lc_goodfile_read(filename, path=)
+      data  = lc_goodfile_read(filename, sysid, path=)
+
+    INPUTS:
+      filename - name of the multi-system fits file
+
+    OPTIONAL INPUTS:
+      sysid - system identifier (default: return the index)
+      path  - path for the filename (default is present directory)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      index - record array of sysid, hdu, offset, nimage, npts
+      data  - 'good' table of the system (time, lc_A, ..., err_A, ...) with
+              one row, as from a single 'good' file
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      data = lc_goodfile_read('rung0_good.fits', 17)
+      time, lcA = data.time[0], data.lc_A[0]
+
+    COMMENTS:
+      Only the primary header, the INDEX table (at the byte offset
+      TDCINDX of the primary header) and the HDU of the requested system
+      (at its byte offset in the index) are read, without scanning the
+      other HDUs, and the file is closed on return.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- read the index at its offset
+    input  = (path if path else '') + filename
+    offset = fits.getheader(input)['TDCINDX']
+
+    with open(input, 'rb') as fin:
+        fin.seek(offset)
+        index = fits.BinTableHDU.readfrom(fin).data
+
+        if sysid==None: return index
+
+
+
+# -------- read the system at its offset
+        match = np.where(index.sysid == str(sysid))[0]
+
+        if match.size==0:
+            print "LC_GOODFILE_READ: system ", sysid, " not in ", input
+            return
+
+        fin.seek(int(index.offset[match[0]]))
+
+        return fits.BinTableHDU.readfrom(fin).data
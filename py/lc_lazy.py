@@ -0,0 +1,102 @@
+import sys
+import types
+import importlib
+
+class lc_lazy(object):
+
+    """
+      Stand-in for a module which is imported on first use, so that
+      heavy dependencies (pyfits, scipy.signal, scipy.interpolate,
+      matplotlib) cost nothing to processes which never call the
+      functions that need them.
+
+        fits = lc_lazy('pyfits')
+        ...
+        fits.getdata(filename)      # pyfits is imported here
+    """
+
+    __slots__ = ['_name', '_module']
+
+    def __init__(self, name):
+
+        """ Set the name of the module """
+
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def __getattr__(self, attr):
+
+        """ Import the module (once) and return its attribute """
+
+        module = object.__getattribute__(self, '_module')
+
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+
+        return getattr(module, attr)
+
+    def __repr__(self):
+
+        """ Name the module and whether it is loaded """
+
+        return "<lc_lazy module '{0}' ({1})>".format(self._name, 'loaded' \
+                                                         if self._module \
+                                                         else 'not loaded')
+
+
+
+class lc_lazy_package(types.ModuleType):
+
+    """
+      Package whose public names are imported from their modules on first
+      access, so that importing the package (or one of its modules) does
+      not import all of the others.  The package replaces itself in
+      sys.modules at the end of its __init__:
+
+        lc_lazy_package(__name__, {'lc_noise':['lc_noise'], ...})
+
+      exports maps each module (relative to prefix, default the package)
+      to its public names.  from <package> import * imports everything.
+    """
+
+    def __init__(self, name, exports, prefix=None):
+
+        """ Replace the package name in sys.modules by a lazy package
+            exporting the names of exports """
+
+        types.ModuleType.__init__(self, name)
+
+        # the module of each public name
+        self._where  = dict((attr, module) for module, attrs in \
+                                exports.items() for attr in attrs)
+        self._prefix = name + '.' if prefix==None else prefix
+
+        # keep the original package (and its globals) alive
+        package = sys.modules[name]
+        self.__dict__.update(package.__dict__)
+
+        self._package = package
+        self.__all__  = sorted(self._where)
+
+        sys.modules[name] = self
+
+    def __getattribute__(self, attr):
+
+        """ Return the public name attr from its module (imported on first
+            access), or the attribute of the package """
+
+        where = types.ModuleType.__getattribute__(self, '_where')
+
+        if attr not in where:
+            return types.ModuleType.__getattribute__(self, attr)
+
+        prefix = types.ModuleType.__getattribute__(self, '_prefix')
+
+        return getattr(importlib.import_module(prefix + where[attr]), attr)
+
+    def __dir__(self):
+
+        """ List the public names with the attributes of the package """
+
+        return sorted(set(self.__all__) | set(self.__dict__))
@@ -1,13 +1,19 @@
 import numpy as np
-import pyfits as fits
 from lc_car_gen import *
+from lc_cadence import *
 from lc_sample import *
 from lc_spline import *
 from lc_noise import *
 from lc_add_tdelay import *
+from lc_refine import *
 from lc_write import *
+from lc_archive import *
+from lc_metrics import *
+from lc_lazy import *
 
-class lightcurve():
+fits = lc_lazy('pyfits')
+
+class lightcurve(object):
 
     """
       Light curve class includes the following data.
@@ -19,42 +25,112 @@ class lightcurve():
         noise parameters      : seed_n, amp_n
         time delay utils      : tdelay, lc_buff
         identifier data       : dtype, names
+
+      lc_buff and lc are views of a single backing buffer (the delay
+      buffer followed by the light curve), stored in float32 if single
+      is set.  If compact is set, the uniform time grid is stored as
+      t0 and dt and time is computed on access.  noise, time_sp and
+      lc_sp are allocated on first access, and time_samp and lc_samp are
+      time and lc until the curve is sampled.  usrind holds the identity
+      of the sampling schedule (see lc_sample_schedule, 0 if none).
+
+      Random draws come from generators derived from seed and seed_n
+      (see lc_rng), or from rng (a numpy Generator) if one is input.
+
+      The stages of the pipeline, intrinsic -> delay -> sample -> noise
+      -> spline, are tracked: once sampled (and splined), a new
+      intrinsic curve (car_gen), a delay (add_tdelay) or a new seed_n or
+      amp_n marks only the stages downstream of the change as stale, and
+      those are recomputed when the sampled curve is next accessed (see
+      update).  The cadence indices come from the process-wide cache of
+      lc_sample_schedule, so scans over delays or noise realizations do
+      not re-sample the curve.
     """
 
-# -------- initialize the light curve parameters
-    def __init__(self, seed, seed_n, meanmag=None, mag0=None, tau=None, \
-                     sigma=None, amp_n=None, filename=None, path=None):
+    __slots__ = ['seed', 'meanmag', 'mag0', 'tau', 'sigma', 't0', 'dt', \
+                     'daily', 'weekly', 'season', 'tdelay', 'dtype', \
+                     'names', 'cache', 'compact', 'single', 'rng', 'nbuff', \
+                     '_buf', '_time', '_time_samp', '_lc_samp', '_noise', \
+                     '_time_sp', '_lc_sp', '_usrind', '_seed_n', '_amp_n', \
+                     '_cadence', '_splopt', '_live', '_stale']
 
-        """ Initialize the light curve parameters """
+    # stages derived from the intrinsic curve (in order, see update)
+    stages = ['sample', 'noise', 'spline']
 
-        # read in the light curve from a file
+# -------- initialize the light curve parameters
+    def __init__(self, seed, seed_n, meanmag=None, mag0=None, tau=None, \
+                     sigma=None, amp_n=None, filename=None, path=None, \
+                     cache=None, compact=None, single=None, rng=None):
+
+        """ Initialize the light curve parameters (intrinsic curves are
+            looked up in and stored to cache, an lc_cache instance, if 
+            input; see the class doc for compact, single and rng) """
+
+        # cache of intrinsic light curves, storage options and generator
+        self.cache   = cache
+        self.compact = compact
+        self.single  = single
+        self.rng     = rng
+
+        # empty light curve
+        self._buf   = np.zeros(0)
+        self.nbuff  = 0
+        self._time  = np.zeros(0)
+        self.t0     = 0.0
+        self.dt     = None
+
+        self._time_samp = self._lc_samp = self._noise = None
+        self._time_sp   = self._lc_sp   = self._usrind = None
+
+        # nothing derived yet (cadence and spline options of the tracked
+        # stages, see update)
+        self._cadence = self._splopt = None
+        self._live    = self._stale = frozenset()
+
+        # read in the light curve from a file (fits or archive, see
+        # lc_archive)
         if filename:
             input = (path if path else '') + filename
-            tbl   = fits.getdata(input)
-
-            self.seed      = tbl.seed[0]
-            self.meanmag   = tbl.meanmag[0]
-            self.mag0      = tbl.mag0[0]
-            self.tau       = tbl.tau[0]
-            self.sigma     = tbl.sigma[0]
-            self.time      = tbl.time[0]
-            self.lc        = tbl.lc[0]
-            self.time_samp = tbl.time_samp[0]
-            self.lc_samp   = tbl.lc_samp[0]
-            self.noise     = tbl.noise[0]
-            self.time_sp   = tbl.time_sp[0]
-            self.lc_sp     = tbl.lc_sp[0]
-            self.daily     = tbl.daily[0]
-            self.weekly    = tbl.weekly[0]
-            self.season    = tbl.season[0]
-            self.usrind    = tbl.usrind[0]
-            self.seed_n    = tbl.seed_n[0]
-            self.amp_n     = tbl.amp_n[0]
-            self.tdelay    = tbl.tdelay[0]
-            self.lc_buff   = tbl.lc_buff[0]
+
+            if lc_archive.isarchive(input):
+                tbl = lc_archive(input)
+                row = lambda name: np.array(tbl[name]) if \
+                    isinstance(tbl[name], np.ndarray) else tbl[name]
+            else:
+                tbl = fits.getdata(input)
+                row = lambda name: tbl.field(name)[0]
+
+            self.seed      = row('seed')
+            self.meanmag   = row('meanmag')
+            self.mag0      = row('mag0')
+            self.tau       = row('tau')
+            self.sigma     = row('sigma')
+            self.lc        = row('lc')
+            self.time_samp = row('time_samp')
+            self.lc_samp   = row('lc_samp')
+            self.noise     = row('noise')
+            self.time_sp   = row('time_sp')
+            self.lc_sp     = row('lc_sp')
+            self.daily     = row('daily')
+            self.weekly    = row('weekly')
+            self.season    = row('season')
+            self.usrind    = row('usrind')
+            self.seed_n    = row('seed_n')
+            self.amp_n     = row('amp_n')
+            self.tdelay    = row('tdelay')
+            self.lc_buff   = row('lc_buff')
             self.dtype     = 'lightcurve'
             self.names     = tbl.names
 
+            # the time grid of a compact archive, else the time vector
+            if getattr(tbl, 'compact', None):
+                self.compact = 1
+                self._time   = None
+                self.t0      = tbl.t0
+                self.dt      = tbl.dt
+            else:
+                self.time = row('time')
+
             return
 
         # initialize data type and names
@@ -71,46 +147,242 @@ class lightcurve():
         self.tau     = tau if tau else 10.**2.5 # [day]
         self.sigma   = sigma if sigma else 8.0e-3 # [mag day^-1/2]
 
-        # generate the lightcurve at low resolution
-        self.time, self.lc = lc_car_gen(self.seed, meanmag=self.meanmag, \
-                                            mag0=self.mag0, tau=self.tau, \
-                                            sigma=self.sigma, lores=1, \
-                                            year=12.)
-
-        # initialize the buffer for time delay
-        self.lc_buff = self.lc[self.time < 730.]
-        self.lc      = self.lc[self.time >= 730.]
-        self.time    = self.time[self.time < 3650.]
-        self.tdelay  = 0.0
-
-        # initialize the sampled lightcurve, noise, and spline model
-        self.time_samp = self.time
-        self.lc_samp   = self.lc
-        self.noise     = np.zeros(self.lc_samp.size)
-        self.time_sp   = np.zeros(self.time.size)
-        self.lc_sp     = np.zeros(self.lc.size)
+        # generate the lightcurve at low resolution (this also initializes
+        # the buffer for time delay and the sampled and splined curves)
+        self.set_grid(*lc_car_gen(self.seed, meanmag=self.meanmag, \
+                                      mag0=self.mag0, tau=self.tau, \
+                                      sigma=self.sigma, lores=1, year=12., \
+                                      cache=self.cache, rng=self.rng))
 
         # intialize the sampling parameter flags
         self.daily = self.weekly = self.season = 0
-        self.usrind = np.zeros(self.time.size, dtype='byte')
 
         # initialize the noise parameters
         self.seed_n = seed_n
         self.amp_n  = amp_n if amp_n else 0.03 # noise amp in flux units
 
 
+# -------- store an intrinsic light curve generated on a uniform grid
+    def set_grid(self, time, lc):
+
+        """ Store an intrinsic light curve generated on a uniform grid
+            starting at t=0: the first 730 days become the buffer for time
+            delay and the following days the light curve """
+
+        # the generated curve is the backing buffer (copied only if it is
+        # read-only, e.g. from the cache, or needs conversion)
+        dtype     = np.float32 if self.single else np.float64
+        self._buf = np.asarray(lc, dtype=dtype)
+        if not self._buf.flags.writeable: self._buf = self._buf.copy()
+
+        self.nbuff  = int((time < 730.).sum())
+        self.tdelay = 0.0
+
+        # store the time grid explicitly or as (t0, dt)
+        ntime   = self._buf.size - self.nbuff
+        self.t0 = 0.0
+        self.dt = time[1] - time[0]
+
+        self._time = None if self.compact else np.array(time[:ntime])
+
+        # reset sampled and splined curves (re-sampled with the same
+        # cadence on access if sampled with sample())
+        self._time_samp = self._lc_samp = self._noise = None
+        self._time_sp   = self._lc_sp   = self._usrind = None
+
+        if 'sample' not in self._live: self._live = frozenset()
+        self.invalidate('sample')
+
+
+# -------- the intrinsic light curve and buffer (views of one buffer)
+    @property
+    def time(self):
+        """ Intrinsic time [day] (computed from t0 and dt if compact) """
+        if self._time is not None: return self._time
+        return self.t0 + self.dt*np.arange(self._buf.size - self.nbuff)
+
+    @time.setter
+    def time(self, value):
+        self._time = np.asarray(value)
+        self.dt    = self._time[1] - self._time[0] if self._time.size > 1 \
+            else None
+
+    @property
+    def lc(self):
+        """ Intrinsic light curve (view of the backing buffer) """
+        return self._buf[self.nbuff:]
+
+    @lc.setter
+    def lc(self, value):
+        self._buf = np.concatenate([self._buf[:self.nbuff], value])
+
+    @property
+    def lc_buff(self):
+        """ Buffer for time delay (view of the backing buffer) """
+        return self._buf[:self.nbuff]
+
+    @lc_buff.setter
+    def lc_buff(self, value):
+        self._buf  = np.concatenate([value, self._buf[self.nbuff:]])
+        self.nbuff = np.size(value)
+
+
+# -------- sampled and splined curves (allocated on first access)
+    @property
+    def time_samp(self):
+        """ Sampled time (time if not sampled) """
+        if self._stale: self.update()
+        return self.time if self._time_samp is None else self._time_samp
+
+    @time_samp.setter
+    def time_samp(self, value):
+        self._time_samp = value
+
+    @property
+    def lc_samp(self):
+        """ Sampled light curve (lc if not sampled) """
+        if self._stale: self.update()
+        return self.lc if self._lc_samp is None else self._lc_samp
+
+    @lc_samp.setter
+    def lc_samp(self, value):
+        self._lc_samp = value
+
+    @property
+    def noise(self):
+        """ Noise realization (zeros if none) """
+        if self._stale: self.update()
+        if self._noise is None: self._noise = np.zeros(self.lc_samp.size)
+        return self._noise
+
+    @noise.setter
+    def noise(self, value):
+        self._noise = value
+
+    @property
+    def time_sp(self):
+        """ Spline time (zeros if no spline) """
+        if self._stale: self.update()
+        if self._time_sp is None: self._time_sp = np.zeros(self.lc.size)
+        return self._time_sp
+
+    @time_sp.setter
+    def time_sp(self, value):
+        self._time_sp = value
+
+    @property
+    def lc_sp(self):
+        """ Spline light curve (zeros if no spline) """
+        if self._stale: self.update()
+        if self._lc_sp is None: self._lc_sp = np.zeros(self.lc.size)
+        return self._lc_sp
+
+    @lc_sp.setter
+    def lc_sp(self, value):
+        self._lc_sp = value
+
+    @property
+    def usrind(self):
+        """ Identity of the sampling schedule, shape (1,) (see
+            lc_sample_schedule, 0 if none) """
+        if self._stale: self.update()
+        if self._usrind is None: self._usrind = np.zeros(1, dtype=np.int64)
+        return self._usrind
+
+    @usrind.setter
+    def usrind(self, value):
+        self._usrind = value
+
+    @property
+    def seed_n(self):
+        """ Seed of the noise (setting it marks the noise stale) """
+        return self._seed_n
+
+    @seed_n.setter
+    def seed_n(self, value):
+        self._seed_n = value
+        self.invalidate('noise')
+
+    @property
+    def amp_n(self):
+        """ Noise amplitude in flux units (setting it marks the noise
+            stale) """
+        return self._amp_n
+
+    @amp_n.setter
+    def amp_n(self, value):
+        self._amp_n = value
+        self.invalidate('noise')
+
+
+# -------- track the stages derived from the intrinsic curve
+    def invalidate(self, stage):
+
+        """ Mark stage ('sample', 'noise' or 'spline') and the stages
+            downstream of it as stale (stages which were never computed
+            are not tracked) """
+
+        stale       = self.stages[self.stages.index(stage):]
+        self._stale = self._stale | (self._live & frozenset(stale))
+
+    @lc_timed('lightcurve.update')
+    def update(self):
+
+        """ Recompute the stale stages: re-sample (with the cached
+            cadence indices, see lc_sample_schedule), redraw the noise
+            and refit the spline """
+
+        stale       = self._stale
+        self._stale = frozenset()
+
+        # the cadence indices only depend on the time grid
+        if 'sample' in stale:
+            time       = self.time
+            sid, index = lc_sample_schedule(time, **self._cadence)
+
+            self._usrind = np.array([sid], dtype=np.int64)
+            self._time_samp, self._lc_samp = lc_sample(time, self.lc, \
+                                                           index=index)
+
+        if 'noise' in stale:
+            lc_samp     = self.lc if self._lc_samp is None else self._lc_samp
+            self._noise = lc_noise(lc_samp, self._seed_n, \
+                                       amp_n=self._amp_n, rng=self.rng)
+
+        if 'spline' in stale:
+            self.spline(**self._splopt)
+
+
 # -------- generate the intrinsic light curve at high (default) or
 #          medium resolution
+    @lc_timed('lightcurve.car_gen')
     def car_gen(self, seed=None, meanmag=None, mag0=None, tau=None, \
-                    sigma=None, medres=None):
+                    sigma=None, medres=None, fft=None, pad=None, daily=None, \
+                    weekly=None, season=None, tsamp=None, cache=None, \
+                    rng=None):
 
         """ Generate the intrinsic light curve at high (default) or 
-            medium resolution """
+            medium resolution (with fft=1 the curve is synthesized in 
+            Fourier space on a grid padded by pad, see lc_car_gen).
+
+            If a cadence is input (daily, weekly, season flags or an
+            explicit tsamp vector of epochs in days) the curve is instead
+            generated exactly at those epochs and sampled with a noise
+            realization.  No intrinsic grid or delay buffer is kept in that
+            case, so add_tdelay is not available: delayed images of one
+            source must be generated together in a single call of
+            lc_car_gen at the union of their shifted epochs.
+
+            cache (an lc_cache instance) and rng (a numpy Generator)
+            replace the instance cache and generator. """
 
         # utilities
-        resstr = 'HIRES' if medres==None else 'MEDRES'
+        epochs = daily or weekly or season or (tsamp is not None)
+        resstr = 'SAMPLED' if epochs else 'HIRES' if medres==None else \
+            'MEDRES'
 
-        print "LC_LGHTCRV: GENERATING {0} LC WITH CAR...".format(resstr)
+        lc_log("LC_LGHTCRV: GENERATING {0} LC WITH {1}...".format(resstr, \
+                                                       'FFT' if fft else 'CAR'))
 
         # reset lightcurve parameters if input
         if seed:    self.seed    = seed
@@ -118,66 +390,165 @@ class lightcurve():
         if mag0:    self.mag0    = mag0
         if tau:     self.tau     = tau
         if sigma:   self.sigma   = sigma
+        if cache:   self.cache   = cache
+        if rng is not None: self.rng = rng
+
+        # generate the light curve only at the sampled epochs if desired
+        if epochs:
+            if tsamp is None:
+                tsamp = lc_cadence(daily=daily, weekly=weekly, season=season)
+
+            self.tdelay = 0.0
+            self.time   = np.asarray(tsamp, dtype=float)
+            lcsamp      = lc_car_gen(self.seed, meanmag=self.meanmag, \
+                                         mag0=self.mag0, tau=self.tau, \
+                                         sigma=self.sigma, \
+                                         tsamp=self.time+730., \
+                                         cache=self.cache, rng=self.rng)[1]
+
+            self.nbuff = 0
+            self._buf  = np.array(lcsamp, dtype=np.float32 if self.single \
+                                      else np.float64)
+
+            # the intrinsic curve is the sampled curve (only the noise is
+            # tracked)
+            self._time_samp = self._lc_samp = None
+            self._time_sp   = self._lc_sp   = self._usrind = None
+            self._cadence   = self._splopt  = None
+            self._live      = frozenset(['noise'])
+            self._stale     = frozenset()
+
+            self.noise = lc_noise(self.lc_samp, self.seed_n, amp_n=self.amp_n, \
+                              rng=self.rng)
+
+            # set the sampling flags appropriately
+            self.daily  = 1 if daily else 0
+            self.weekly = 1 if weekly else 0
+            self.season = 1 if season else 0
 
-        # generate light curve at higher res (medium or high)
-        self.time, self.lc = lc_car_gen(self.seed, meanmag=self.meanmag, \
-                                            mag0=self.mag0, tau=self.tau, \
-                                            sigma=self.sigma, year=12., \
-                                            medres=medres)
-
-        # initialize the buffer for time delay
-        self.lc_buff = self.lc[self.time < 730.]
-        self.lc      = self.lc[self.time >= 730.]
-        self.time    = self.time[self.time < 3650.]
-        self.tdelay  = 0.0
-
-        # reset sampled and splined curves
-        self.time_samp = self.time
-        self.lc_samp   = self.lc
-        self.noise     = np.zeros(self.lc_samp.size)
+            return
 
-        self.time_sp = np.zeros(self.time.size)
-        self.lc_sp   = np.zeros(self.lc.size)
+        # generate light curve at higher res (medium or high) (this also
+        # initializes the buffer for time delay and resets the sampled and
+        # splined curves, which are re-sampled with the same cadence if
+        # sampled with sample())
+        self.set_grid(*lc_car_gen(self.seed, meanmag=self.meanmag, \
+                                      mag0=self.mag0, tau=self.tau, \
+                                      sigma=self.sigma, year=12., \
+                                      medres=medres, fft=fft, pad=pad, \
+                                      cache=self.cache, rng=self.rng))
 
-        # intialize the sampling parameter flags
-        self.daily = self.weekly = self.season = 0
-        self.usrind = np.zeros(self.time.size, dtype='byte')
+        # intialize the sampling parameter flags (if not sampled)
+        if 'sample' not in self._live:
+            self.daily = self.weekly = self.season = 0
 
 
 # -------- sample the light curve and add a noise realization
+    @lc_timed('lightcurve.sample')
     def sample(self, daily=None, weekly=None, season=None, index=None, \
-                   amp_n=None, seed_n=None):
+                   amp_n=None, seed_n=None, sealen=None, seagap=None, \
+                   nyear=None, nvisit=None, dvisit=None, rng=None):
+
+        """ Sample the light curve and add a noise realization (see
+            lc_sample for the cadence keywords; rng, a numpy Generator,
+            replaces the instance generator).  If the cadence is that of
+            the previous call and the intrinsic curve is unchanged, only
+            the noise is redrawn.  A curve generated at sampled epochs
+            (see car_gen) is already sampled: a cadence raises a
+            ValueError, and without one only the noise is redrawn. """
+
+        # curves generated at sampled epochs (irregular times, no grid)
+        if self.nbuff==0:
+            if daily or weekly or season or nyear or index is not None:
+                raise ValueError("LC_LGHTCRV: curve was generated at " \
+                                     "sampled epochs, it cannot be " \
+                                     "re-sampled with a cadence.")
+
+            if amp_n:  self._amp_n  = amp_n
+            if seed_n: self._seed_n = seed_n
+            if rng is not None: self.rng = rng
+
+            self._stale = self._stale | frozenset(['noise'])
+            self.update()
 
-        """ Sample the light curve and add a noise realization """
-
-        # sample the light curve
-        self.time_samp, self.lc_samp = lc_sample(self.time, self.lc, \
-                                                     daily=daily, \
-                                                     weekly=weekly,\
-                                                     season=season, \
-                                                     index=index)
-
-        # generate a noise realization
-        if amp_n:  self.amp_n  = amp_n
-        if seed_n: self.seed_n = seed_n
+            return
 
-        self.noise = lc_noise(self.lc_samp, self.seed_n, amp_n=self.amp_n)
+        # the cadence (a new one is re-sampled, an unchanged one is kept)
+        cadence = {'daily':daily, 'weekly':weekly, 'season':season, \
+                       'index':index, 'sealen':sealen, 'seagap':seagap, \
+                       'nyear':nyear, 'nvisit':nvisit, 'dvisit':dvisit}
+        same    = 'sample' in self._live and index is None and \
+            self._cadence['index'] is None and cadence==self._cadence
+
+        if not same:
+            self._cadence = cadence
+            self._stale   = self._stale | frozenset(['sample'])
+
+        # the noise parameters
+        if amp_n:  self._amp_n  = amp_n
+        if seed_n: self._seed_n = seed_n
+        if rng is not None: self.rng = rng
+
+        # sample the light curve (if needed) and generate a noise
+        # realization
+        self._live  = frozenset(['sample', 'noise'])
+        self._stale = (self._stale | frozenset(['noise'])) - \
+            frozenset(['spline'])
+        self.update()
 
         # set the sampling flags appropriately
         self.daily  = 1 if daily else 0
         self.weekly = 1 if weekly else 0
         self.season = 1 if season else 0
-        self.usrind = np.zeros(self.time.size, dtype='byte')
 
         # reset spline since it no longer applies
-        self.time_sp = np.zeros(self.time.size)
-        self.lc_sp   = np.zeros(self.lc.size)
+        self.time_sp = self.lc_sp = self._splopt = None
 
 
-# -------- generate a spline model for the sampled light curve
-    def spline(self, xr=None, nx=None, wgt=None):
+# -------- generate a batch of noise realizations for the sampled curve
+    @lc_timed('lightcurve.noise_batch')
+    def noise_batch(self, nreal, seed_n=None, amp_n=None, rng=None):
+
+        """ Return nreal noise realizations of the sampled light curve,
+            shape (nreal, nsamp), without re-sampling it or changing
+            noise (see lc_noise; with the default seed_n and amp_n the
+            first realization is noise) """
 
-        """ Generate a spline model for the sampled light curve """
+        seed_n = self.seed_n if seed_n==None else seed_n
+        amp_n  = self.amp_n if amp_n==None else amp_n
+        rng    = self.rng if rng is None else rng
+
+        return lc_noise(self.lc_samp, seed_n, amp_n=amp_n, rng=rng, \
+                            nreal=nreal)
+
+
+# -------- generate a spline model for the sampled light curve
+    @lc_timed('lightcurve.spline')
+    def spline(self, xr=None, nx=None, wgt=None, season=None, time_sp=None):
+
+        """ Generate a spline model for the sampled light curve.  With
+            season set, smoothing splines weighted by the noise amplitude
+            are fit to each observing season and evaluated at time_sp 
+            (default time_samp, see lc_spline_season); otherwise an
+            interpolating spline is evaluated on the intrinsic grid.  The
+            spline is refit with the same options when the sampled curve
+            changes (see update). """
+
+        # track the spline
+        self._stale  = self._stale - frozenset(['spline'])
+        self._live   = self._live | frozenset(['spline'])
+        self._splopt = {'xr':xr, 'nx':nx, 'wgt':wgt, 'season':season, \
+                            'time_sp':time_sp}
+
+        # fit smoothing splines season by season
+        if season:
+            self.time_sp = self.time_samp if time_sp is None else \
+                np.asarray(time_sp, dtype=float)
+            self.lc_sp   = lc_spline_season(self.time_samp, self.lc_samp + \
+                                                self.noise, \
+                                                sig=1.0857*self.amp_n, \
+                                                x_sp=self.time_sp)
+            return
 
         # utilities
         nx = self.time.size
@@ -191,30 +562,71 @@ class lightcurve():
 
 # -------- add a time delay to the intrinsic light curve (successive
 #          calls are possible)
-    def add_tdelay(self, tdelay):
+    @lc_timed('lightcurve.add_tdelay')
+    def add_tdelay(self, tdelay, subgrid=None):
 
         """ Add a time delay to the intrinsic light curve (successive calls
-            are possible) """
+            are possible).  Delays that are not a multiple of the time
+            resolution require subgrid='bridge' (exact conditional draw 
+            at the delayed times, seeded by seed) or 'fourier' (see 
+            lc_add_tdelay). """
+
+        # curves generated at sampled epochs have no delay buffer
+        if self.nbuff==0:
+            print "LC_LGHTCRV: curve was generated at sampled epochs, " + \
+                "generate the delayed images together with lc_car_gen()."
+            return
 
         # set the time delay
         self.tdelay = tdelay
 
-        # add the time delay (self.lc and self.lc_buff are modified)
-        lc_add_tdelay(self.time, self.lc, self.tdelay, buffer=self.lc_buff)
+        # add the time delay (self.lc and self.lc_buff are modified); since
+        # both are views of the backing buffer, shifting the buffer is the
+        # same as shifting lc with lc_buff prepended
+        lc_add_tdelay(self.time, self._buf, self.tdelay, subgrid=subgrid, \
+                          meanmag=self.meanmag, tau=self.tau, \
+                          sigma=self.sigma, seed=self.seed, rng=self.rng)
+
+        # re-sample the delayed curve on access with the cached cadence
+        # indices if sampled with sample(), else reset the sampled and
+        # splined curves (which are then no longer tracked)
+        if 'sample' in self._live:
+            self.invalidate('sample')
+        else:
+            self.time_samp = self.lc_samp = self.noise = None
+            self.time_sp   = self.lc_sp   = self._splopt = None
+            self._live     = self._stale  = frozenset()
+
 
-        # reset sampled and splined curves
-        self.time_samp = self.time
-        self.lc_samp   = self.lc
-        self.noise     = np.zeros(self.lc_samp.size)
+# -------- refine the intrinsic light curve within time windows
+    @lc_timed('lightcurve.refine')
+    def refine(self, windows, dt=None):
 
-        self.time_sp = np.zeros(self.time.size)
-        self.lc_sp   = np.zeros(self.lc.size)
+        """ Return the intrinsic light curve refined to the time step dt
+            (default 0.01 day) within windows [[tmin, tmax], ...] as
+            (time, lc), drawn from the exact bridge between the points of
+            the present curve, e.g. the default 1 day curve (see
+            lc_refine; the instance is not modified) """
+
+        return lc_refine(self.time, self.lc, windows, dt=dt, \
+                             meanmag=self.meanmag, tau=self.tau, \
+                             sigma=self.sigma, seed=self.seed, rng=self.rng)
 
 
 # -------- write this instance to a file
-    def write(self, filename, path=None, clobber=None):
+    @lc_timed('lightcurve.write')
+    def write(self, filename, path=None, clobber=None, archive=None, \
+                  compress=None):
+
+        """ Write this instance to a file (evil only), or to an archive
+            (see lc_archive_write) if archive or compress is set """
+
+        # write to an archive
+        if archive or compress:
+            lc_archive_write([], self, 'evil', filename, path=path, \
+                                 clobber=clobber, compress=compress)
+            return
 
-        """ Write this instance to a file (evil only) """
         # write to file
         lc_write([], self, 'evil', filename, path=path, clobber=clobber)
 
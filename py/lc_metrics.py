@@ -0,0 +1,295 @@
+import sys
+import resource
+import cProfile
+import pstats
+import functools
+import time as tm
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# instrumentation state of the process (see lc_metrics)
+_state = {'verbose':False, 'progress':None, 'record':None}
+
+def lc_verbose(flag=True):
+
+    """ Print (flag=True) or silence (flag=False, the default) the status
+        messages of the package (errors are always printed) """
+
+    _state['verbose'] = bool(flag)
+
+
+def lc_log(msg):
+
+    """ Print a status message if the package is verbose (see lc_verbose) """
+
+    if _state['verbose']: print msg
+
+
+def lc_set_progress(callback=None):
+
+    """ Set the progress callback, called as callback(stage, done, total) by
+        long loops (lc_ensemble, the reference lc_car_gen), or remove it
+        with None (the default); lc_progress_print prints a status line """
+
+    _state['progress'] = callback
+
+
+def lc_metrics_active():
+
+    """ Return the active metrics record (None if there is none) """
+
+    return _state['record']
+
+
+def lc_progress(stage, done, total):
+
+    """ Report progress to the progress callback (if any) """
+
+    if _state['progress'] is not None: _state['progress'](stage, done, total)
+
+
+def lc_progress_print(stage, done, total):
+
+    """ Progress callback printing a status line which is overwritten """
+
+    sys.stdout.write('{0}: {1} of {2}{3}'.format(stage.upper(), done, total, \
+                                                     '\n' if done >= total \
+                                                     else '\r'))
+    sys.stdout.flush()
+
+
+
+class lc_timer(object):
+
+    """
+      Context manager timing a stage (wall clock and allocation) into the
+      active metrics record; it does nothing if no record is active.
+
+        with lc_timer('lc_write'):
+            ...
+    """
+
+    __slots__ = ['stage', 'record', 'start', 'mem0']
+
+    def __init__(self, stage):
+
+        """ Set the name of the stage """
+
+        self.stage  = stage
+        self.record = None
+
+    def __enter__(self):
+
+        """ Start the clock and the allocation count """
+
+        self.record = _state['record']
+        if self.record is None: return self
+
+        self.record.push_peak()
+
+        self.mem0  = self.record.memory()
+        self.start = tm.time()
+
+        return self
+
+    def __exit__(self, *args):
+
+        """ Add the time and allocation of the stage to the record """
+
+        if self.record is None: return
+
+        self.record.add(self.stage, tm.time() - self.start, \
+                            self.record.pop_peak() - self.mem0)
+
+
+def lc_timed(stage):
+
+    """ Decorator timing every call of a function or method as stage (see
+        lc_timer) """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with lc_timer(stage): return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+
+class lc_metrics(object):
+
+    """
+      Metrics record of a run.  While active (in a with block) it collects
+      the wall clock time, number of calls and allocated memory of each
+      stage timed with lc_timer/lc_timed (e.g. every lightcurve and
+      lc_system method, lc_write and lc_read), optionally with a cProfile
+      capture of the block (profile=1) and with allocations measured by
+      tracemalloc (trace=1, python >= 3.4, else by the growth of the peak
+      resident memory).
+
+        with lc_metrics(profile=1) as met:
+            lc_ensemble(systems, path='rung0/')
+        met.report()
+        json.dump(met.as_dict(), open('rung0_metrics.json', 'w'))
+
+      stages is a dictionary of {stage : {'calls', 'seconds', 'alloc_mb'}}
+      and wall the total time of the block.  Records of worker processes
+      (as_dict) are combined with merge.  Nothing is printed or collected
+      unless a record is active.
+    """
+
+    def __init__(self, profile=None, trace=None):
+
+        """ Set the capture modes """
+
+        self.stages  = {}
+        self.wall    = 0.0
+        self.profile = None
+        self.prof    = cProfile.Profile() if profile else None
+        self.trace   = bool(trace) and tracemalloc is not None
+        self.traced  = False
+        self.peaks   = []
+        self.prev    = None
+        self.start   = None
+
+
+# -------- activate and deactivate the record
+    def __enter__(self):
+
+        """ Activate the record (and the profiler and tracer) """
+
+        self.prev        = _state['record']
+        _state['record'] = self
+
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.traced = True
+        if self.prof: self.prof.enable()
+
+        self.start = tm.time()
+
+        return self
+
+    def __exit__(self, *args):
+
+        """ Deactivate the record and collect the profile """
+
+        self.wall += tm.time() - self.start
+
+        if self.prof:
+            self.prof.disable()
+            self.profile = pstats.Stats(self.prof)
+
+        # (tracing started elsewhere is left running)
+        if self.traced:
+            tracemalloc.stop()
+            self.traced = False
+
+        _state['record'] = self.prev
+
+
+# -------- memory in use (or its peak) in MB
+    def memory(self, peak=None):
+
+        """ Return the traced memory (or its peak) if tracing, else the
+            peak resident memory of the process [MB] """
+
+        if self.trace:
+            return tracemalloc.get_traced_memory()[1 if peak else 0]/1024.**2
+
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        return maxrss/(1024.**2 if sys.platform=='darwin' else 1024.)
+
+
+# -------- peak memory of nested stages
+    def push_peak(self):
+
+        """ Start the peak memory of a stage: with tracemalloc >= 3.9 the
+            peak so far is folded into that of the enclosing stage and
+            the traced peak is reset, so that each stage sees its own
+            peak and the enclosing stages keep theirs (see pop_peak) """
+
+        if not (self.trace and hasattr(tracemalloc, 'reset_peak')): return
+
+        peak = self.memory(peak=True)
+
+        if self.peaks: self.peaks[-1] = max(self.peaks[-1], peak)
+
+        tracemalloc.reset_peak()
+        self.peaks.append(0.0)
+
+    def pop_peak(self):
+
+        """ Return the peak memory of the stage started by the last
+            push_peak and fold it into that of the enclosing stage [MB] """
+
+        peak = self.memory(peak=True)
+
+        if not (self.trace and hasattr(tracemalloc, 'reset_peak')) or \
+                not self.peaks:
+            return peak
+
+        peak = max(self.peaks.pop(), peak)
+
+        if self.peaks: self.peaks[-1] = max(self.peaks[-1], peak)
+
+        return peak
+
+
+# -------- accumulate the records
+    def add(self, stage, seconds, alloc_mb, calls=1):
+
+        """ Add calls of a stage to the record """
+
+        rec = self.stages.setdefault(stage, {'calls':0, 'seconds':0.0, \
+                                                 'alloc_mb':0.0})
+
+        rec['calls']    += calls
+        rec['seconds']  += seconds
+        rec['alloc_mb']  = max(rec['alloc_mb'], alloc_mb)
+
+    def merge(self, other):
+
+        """ Merge a record (or its as_dict, e.g. from a worker process)
+            into this one """
+
+        other = other if isinstance(other, dict) else other.as_dict()
+
+        for stage, rec in other['stages'].items():
+            self.add(stage, rec['seconds'], rec['alloc_mb'], rec['calls'])
+
+    def as_dict(self):
+
+        """ Return the record as a (json serializable) dictionary """
+
+        return {'wall':self.wall, 'stages':self.stages}
+
+
+# -------- report
+    def report(self, nprof=None):
+
+        """ Print the stages sorted by time (and the nprof, default 20,
+            most expensive functions of the profile if captured) """
+
+        print "LC_METRICS: {0:<28}{1:>8}{2:>12}{3:>12}".format('stage', \
+                                                                'calls', \
+                                                                'seconds', \
+                                                                'alloc MB')
+
+        for stage, rec in sorted(self.stages.items(), \
+                                     key=lambda item: -item[1]['seconds']):
+            print "LC_METRICS: {0:<28}{1:>8}{2:>12.4f}{3:>12.1f}" \
+                .format(stage, rec['calls'], rec['seconds'], rec['alloc_mb'])
+
+        print "LC_METRICS: {0:<28}{1:>8}{2:>12.4f}".format('(wall)', '', \
+                                                            self.wall)
+
+        if self.profile:
+            self.profile.sort_stats('cumulative').print_stats(20 if \
+                                                                  nprof==None \
+                                                                  else nprof)
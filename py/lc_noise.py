@@ -1,39 +1,56 @@
 import numpy as np
+from lc_metrics import *
+from lc_rng import *
 
-def lc_noise(lc, seed_n, amp_n=None):
+@lc_timed('lc_noise')
+def lc_noise(lc, seed_n, amp_n=None, rng=None, nreal=None):
 
     """
     NAME:
       lc_noise
 
     PURPOSE:
-      Generate a noise realization for a light curve.
+      Generate a noise realization (or a batch of nreal realizations) for
+      a light curve.
       Note: Does not add the nosie realization to the input lightcurve.  I.e., 
       output is noise in Delta magnitudes NOT lc + noise.
 
     CALLING SEQUENCE:
-      noise = lc_noise(lc, seed_n, amp_n=)
+      noise = lc_noise(lc, seed_n, amp_n=, rng=, nreal=)
 
     INPUTS:
       lc     - light curve with arbitrary time sampling
-      seed_n - seed for the random number generator
+      seed_n - seed for the random number generator (the 'noise' stream,
+               see lc_rng)
 
     OPTIONAL INPUTS:
       amp_n - percent errors in flux units (default is 3%)
+      rng   - a numpy Generator (or RandomState) to draw from instead of
+              the generator derived from seed_n
+      nreal - number of realizations to generate at once (default one)
 
     KEYWORDS:
 
     OUTPUTS:
-      noise - noise realization at each time sampling in Delta magnitudes
+      noise - noise realization at each time sampling in Delta magnitudes,
+              shape (nreal, nsamp) if nreal is input
 
     OPTIONAL OUTPUTS:
 
     EXAMPLES:
+      200 Monte-Carlo realizations of the noise of a sampled curve:
+      noise = lc_noise(lc_samp, 222, nreal=200)
 
     COMMENTS:
+      The realizations of a batch are successive draws of the same
+      generator, so the first one is the single realization of seed_n
+      and the batch is computed with one flux conversion.
 
     REVISION HISTORY:
       02/16/2013 - Written by Greg Dobler (KITP/UCSB)
+      2026/10/17 - Status message through lc_log (silent by default)
+      2026/10/17 - Draws from a generator of its own (see lc_rng)
+      2026/10/17 - Added nreal keyword (batches of realizations)
 
     ------------------------------------------------------------
     """
@@ -41,8 +58,10 @@ def lc_noise(lc, seed_n, amp_n=None):
 # -------- defaults
     amp_n = 0.03 if amp_n==None else amp_n
 
-    print "LC_NOISE: generating {0}% errors with seed={1}".format(amp_n*100., \
-                                                                    seed_n)
+    shape = np.shape(lc) if nreal==None else (nreal,) + np.shape(lc)
+
+    lc_log("LC_NOISE: generating {0}% errors with seed={1}".format(amp_n*100., \
+                                                                     seed_n))
 
 
 
@@ -51,12 +70,18 @@ def lc_noise(lc, seed_n, amp_n=None):
 
 
 
-# -------- generate random noise
-    np.random.seed(seed_n)
-
-    noise = np.random.randn(flux.size)*flux*amp_n
+# -------- generate random noise (in place, the batch may be large)
+    gen    = lc_rng(seed_n, 'noise', rng=rng)
+    noise  = gen.standard_normal(shape)
+    noise *= flux
+    noise *= amp_n
 
 
 
 # -------- return noise in Delta magnitudes
-    return -2.5*np.log10(noise+flux) - lc
+    noise += flux
+    np.log10(noise, out=noise)
+    noise *= -2.5
+    noise -= lc
+
+    return noise
@@ -1,7 +1,12 @@
-import pyfits as fits
+import numpy as np
+import os
+import glob
 from lc_lightcurve import *
+from lc_archive import *
+from lc_metrics import *
 
-def lc_read(filename, path=None):
+@lc_timed('lc_read')
+def lc_read(filename, path=None, lazy=None, columns=None):
 
     """
     NAME:
@@ -11,18 +16,25 @@ def lc_read(filename, path=None):
       Read a lightcurve instance from a file.
 
     CALLING SEQUENCE:
-      lc = lc_read(filename, path=)
+      lc = lc_read(filename, path=, lazy=, columns=)
 
     INPUTS:
-      filename - name of fits (binary table) file
+      filename - name of fits (binary table) file or of an archive (see
+                 lc_archive_write)
 
     OPTIONAL INPUTS:
-      path - path for the filename (default is present directory)
+      path    - path for the filename (default is present directory)
+      columns - list of columns to read (returns an lc_evil instance, or
+                an lc_archive instance for an archive, holding only those
+                columns)
 
     KEYWORDS:
+      lazy - return an lc_evil (lc_archive) instance which reads each
+             column on first access
 
     OUTPUTS:
-      lc - a lightcurve instance
+      lc - a lightcurve instance (or lc_evil or lc_archive instance if lazy
+           or columns)
 
     OPTIONAL OUTPUTS:
 
@@ -32,41 +44,217 @@ def lc_read(filename, path=None):
 
     REVISION HISTORY:
       2013/02/18 - Written by Greg Dobler (KITP/UCSB)
+      2026/10/17 - Added lazy and columns keywords
+      2026/10/17 - Read archives
 
     ------------------------------------------------------------
     """
 
-# -------- utilties
-    input = (path if path else '') + filename
-    lc    = lightcurve(1,1) # initialize lightcurve
+# -------- lazy or column selective read
+    if lazy or columns:
+        if lc_archive.isarchive((path if path else '') + filename):
+            return lc_archive(filename, path=path, columns=columns)
 
+        return lc_evil(filename, path=path, columns=columns)
 
 
-# -------- read in the data
-    tbl = fits.getdata(input)
 
+# -------- read the file into a lightcurve instance and return
+    return lightcurve(-1, -1, filename=filename, path=path)
 
 
-# -------- unpack and put into lc
-    lc.seed      = tbl.seed[0]
-    lc.meanmag   = tbl.meanmag[0]
-    lc.mag0      = tbl.mag0[0]
-    lc.tau       = tbl.tau[0]
-    lc.sigma     = tbl.sigma[0]
-    lc.time      = tbl.time[0]
-    lc.lc        = tbl.lc[0]
-    lc.time_samp = tbl.time_samp[0]
-    lc.lc_samp   = tbl.lc_samp[0]
-    lc.noise     = tbl.noise[0]
-    lc.time_sp   = tbl.time_sp[0]
-    lc.lc_sp     = tbl.lc_sp[0]
-    lc.daily     = tbl.daily[0]
-    lc.weekly    = tbl.weekly[0]
-    lc.season    = tbl.season[0]
-    lc.usrind    = tbl.usrind[0]
-    lc.seed_n    = tbl.seed_n[0]
-    lc.amp_n     = tbl.amp_n[0]
-    lc.tdelay    = tbl.tdelay[0]
-    lc.lc_buff   = tbl.lc_buff[0]
 
-    return lc
+class lc_evil(object):
+
+    """
+      Read-only view of an evil file (a lightcurve instance written by
+      lc_write) with the same attributes as a lightcurve instance.  Only
+      the headers are parsed on initialization; each column is read on 
+      first access through a memory map of its own bytes in the (single
+      row) binary table and copied into memory, so only the columns 
+      which are used are read from disk.  If columns is input, those 
+      columns are read immediately.
+
+        lc = lc_evil('evil_file_lcA.fits')
+        print lc.tau, lc.tdelay       # reads two scalars
+        lcinst = lc.lightcurve()      # full lightcurve instance
+    """
+
+    # fits binary table format codes
+    fmts = {'L':'i1', 'B':'u1', 'I':'>i2', 'J':'>i4', 'K':'>i8', \
+                'E':'>f4', 'D':'>f8', 'A':'S1'}
+
+# -------- read the headers
+    def __init__(self, filename, path=None, columns=None):
+
+        """ Read the table layout from the headers (and read columns if
+            input) """
+
+        self.filename = (path if path else '') + filename
+        self.dtype    = 'lightcurve'
+
+        # column names, formats and byte offsets within the row (the 
+        # headers are parsed directly, which is much faster than opening
+        # the file with pyfits)
+        fin    = open(self.filename, 'rb')
+        self._header(fin)
+        thdr   = self._header(fin)
+        datloc = fin.tell()
+        fin.close()
+
+        self.names   = []
+        self._layout = {}
+
+        for icol in range(1, int(thdr['TFIELDS'])+1):
+            name   = thdr['TTYPE' + str(icol)]
+            form   = thdr['TFORM' + str(icol)]
+            repeat = int(form[:-1]) if len(form) > 1 else 1
+            dtype  = np.dtype(self.fmts[form[-1]])
+
+            self.names.append(name)
+            self._layout[name] = (datloc, dtype, repeat)
+            datloc            += dtype.itemsize*repeat
+
+        if columns:
+            for name in columns: getattr(self, name)
+
+
+# -------- read a header (keywords as strings) and skip its data unit
+    @staticmethod
+    def _header(fin):
+
+        """ Read the header at the current position of fin, leave fin at
+            the start of its data unit and return the keywords """
+
+        hdr = {}
+
+        while 'END' not in hdr:
+            block = fin.read(2880)
+            for icard in range(0, len(block), 80):
+                card = block[icard:icard+80]
+                key  = card[:8].strip()
+                hdr[key] = card[10:].split('/')[0].strip().strip("'").strip()
+                if key=='END': break
+
+        # skip a non-empty primary data unit
+        if 'SIMPLE' in hdr and int(hdr['NAXIS']) > 0:
+            nbyte = abs(int(hdr['BITPIX']))//8
+            for iax in range(1, int(hdr['NAXIS'])+1):
+                nbyte *= int(hdr['NAXIS' + str(iax)])
+            fin.seek(-(-nbyte//2880)*2880, 1)
+
+        return hdr
+
+
+# -------- read a column on first access
+    def __getattr__(self, name):
+
+        """ Read a column on first access """
+
+        if name.startswith('_') or name not in self.__dict__.get('names', []):
+            raise AttributeError(name)
+
+        offset, dtype, repeat = self._layout[name]
+
+        value = np.memmap(self.filename, dtype=dtype, mode='r', \
+                              offset=offset, shape=(repeat,))
+        value = value.astype(dtype.newbyteorder('='))
+        value = value if repeat > 1 else value[0]
+
+        self.__dict__[name] = value
+
+        return value
+
+
+# -------- return an item by its name
+    def __getitem__(self, key):
+
+        """ Return an item by its name. """
+
+        return getattr(self, key)
+
+
+# -------- convert to a lightcurve instance
+    def lightcurve(self):
+
+        """ Return a full lightcurve instance """
+
+        return lightcurve(-1, -1, filename=self.filename)
+
+
+
+def lc_read_table(path=None, pattern=None, files=None, columns=None):
+
+    """
+    NAME:
+      lc_read_table
+
+    PURPOSE:
+      Read the parameters of many evil files into a table without reading
+      the light curve columns (e.g., to build a truth table).
+
+    CALLING SEQUENCE:
+      tbl = lc_read_table(path=, pattern=, files=, columns=)
+
+    INPUTS:
+
+    OPTIONAL INPUTS:
+      path    - directory to scan (default is present directory)
+      pattern - glob pattern of the evil files in path (default '*evil*.fits')
+      files   - list of files to read instead of scanning path
+      columns - columns to read (default all scalar columns: seed, meanmag,
+                mag0, tau, sigma, daily, weekly, season, seed_n, amp_n, 
+                tdelay)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      tbl - numpy record array with a filename field and one field per
+            column, one row per file (sorted by filename)
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      tbl = lc_read_table(path='rung0/')
+      print tbl.filename[tbl.tdelay > 50.]
+
+    COMMENTS:
+      Only the headers and the bytes of the requested fields of each file 
+      are read (see lc_evil).
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    pattern = '*evil*.fits' if pattern==None else pattern
+    columns = ['seed', 'meanmag', 'mag0', 'tau', 'sigma', 'daily', 'weekly', \
+                   'season', 'seed_n', 'amp_n', 'tdelay'] if columns==None \
+                   else columns
+
+    if files==None:
+        files = sorted(glob.glob(os.path.join(path if path else '', \
+                                                  pattern)))
+
+
+
+# -------- read the parameters of each file
+    rows = []
+
+    for ifile in files:
+        lc = lc_evil(ifile, columns=columns)
+        rows.append(tuple([ifile] + [lc[name] for name in columns]))
+
+
+
+# -------- build the table and return
+    if len(rows)==0: return None
+
+    slen  = max([len(ifile) for ifile in files])
+    dtype = [('filename', 'S'+str(slen))] + \
+        [(name, np.asarray(lc[name]).dtype.newbyteorder('=')) \
+             for name in columns]
+
+    return np.rec.fromrecords(rows, dtype=dtype)
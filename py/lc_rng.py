@@ -0,0 +1,121 @@
+import numpy as np
+
+# random stream mode of the process (see lc_rng_legacy)
+_rng_state = {'legacy':False}
+
+# stream identifiers (first element of the SeedSequence spawn key)
+_streams = {'curve':0, 'noise':1, 'bridge':2, 'refine':3}
+
+def lc_rng(seed=None, stream=None, rng=None, legacy=None):
+
+    """
+    NAME:
+      lc_rng
+
+    PURPOSE:
+      Return the random number generator of one random stream of the
+      package (intrinsic curve, noise, bridge or refinement draws) derived
+      from a seed, without touching the global numpy random state.
+
+    CALLING SEQUENCE:
+      gen = lc_rng(seed, stream=, rng=, legacy=)
+
+    INPUTS:
+      seed - the seed (non-negative integer, None for fresh entropy)
+
+    OPTIONAL INPUTS:
+      stream - 'curve' (default), 'noise', 'bridge' or 'refine'
+      rng    - a numpy Generator or RandomState instance, returned as is
+               (so that functions can take either a seed or a generator)
+      legacy - use np.random.RandomState(seed), the stream of the original
+               np.random.seed(seed) calls (default: see lc_rng_legacy)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      gen - generator with a standard_normal method
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      noise of image k of a system with noise seed seed_n:
+      gen = lc_rng(seed_n + k, 'noise')
+
+    COMMENTS:
+      The generator is a numpy Generator seeded with
+      SeedSequence(seed, spawn_key=(stream,)), with stream = 0, 1, 2, 3
+      for the curve, noise, bridge and refine streams, so that the
+      streams of a system are independent even when its seeds coincide.
+      With numpy older than 1.17 (no SeedSequence) it is a RandomState
+      seeded by init_by_array([seed, stream]), which is likewise
+      distinct from the legacy stream.
+
+      Every draw of the package goes through a generator of its own, so
+      stochastic functions can run concurrently in threads, and a result
+      depends only on its seeds.  An ensemble (see lc_ensemble) is thus
+      reproduced bit for bit whatever the number of workers;
+      lc_rng_spawn derives the seeds of the systems of an ensemble from
+      a single master seed.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- an explicit generator
+    if rng is not None: return rng
+
+
+
+# -------- the legacy stream
+    legacy = _rng_state['legacy'] if legacy==None else legacy
+
+    if legacy: return np.random.RandomState(seed)
+
+
+
+# -------- the stream of a SeedSequence (or its closest equivalent)
+    key = _streams['curve' if stream==None else stream]
+
+    if hasattr(np.random, 'SeedSequence'):
+        seq = np.random.SeedSequence(seed, spawn_key=(key,))
+        return np.random.default_rng(seq)
+
+    if seed is None: return np.random.RandomState()
+
+    return np.random.RandomState(np.array([seed, key], dtype=np.uint32))
+
+
+
+def lc_rng_legacy(flag=None):
+
+    """ Use (flag=True) or stop using (flag=False, the default) the legacy
+        streams np.random.RandomState(seed) in every function of the package
+        and return the current setting (see lc_rng) """
+
+    if flag is not None: _rng_state['legacy'] = bool(flag)
+
+    return _rng_state['legacy']
+
+
+
+def lc_rng_spawn(master, nsys):
+
+    """ Return the (seed, seed_n) pairs of nsys systems derived from a
+        master seed, shape (nsys, 2) (SeedSequence(master).spawn(nsys),
+        or RandomState(init_by_array([master, isys])) with old numpy), so
+        that system isys of an ensemble does not depend on how the
+        ensemble is split; the seeds are below 2^30, so that they (and
+        the noise seeds seed_n + k of the images) fit the 32 bit seed
+        columns of the evil files """
+
+    if hasattr(np.random, 'SeedSequence'):
+        seqs = np.random.SeedSequence(master).spawn(nsys)
+        return np.array([iseq.generate_state(2) >> 2 for iseq in seqs], \
+                            dtype=np.int64)
+
+    return np.array([np.random.RandomState(np.array([master, isys], \
+                                                        dtype=np.uint32)) \
+                         .randint(0, 2**30, 2) for isys in range(nsys)], \
+                        dtype=np.int64)
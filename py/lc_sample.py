@@ -1,25 +1,43 @@
 import numpy as np
+import hashlib
+import threading
+from collections import OrderedDict
+from lc_cadence import *
+from lc_metrics import *
+
+# process-wide cache of cadence indices (see lc_sample_schedule)
+_schedule_state = {'nmax':32, 'hits':0, 'misses':0}
+_schedule_cache = OrderedDict()
+_schedule_lock  = threading.Lock()
+
+@lc_timed('lc_sample')
+def lc_sample(time, lc, daily=None, weekly=None, season=None, index=None, \
+                  sealen=None, seagap=None, nyear=None, nvisit=None, \
+                  dvisit=None):
 
-def lc_sample(time, lc, daily=None, weekly=None, season=None, index=None):
-    
     """
     NAME:
       sample_lc
 
-    PURPOSE: 
+    PURPOSE:
       Sample an input light curve with the appropriate cadence.
-      NOTE: only intrinsic time resolutions of 0.01 dy or 1 dy are
-      recognized.
 
     CALLING SEQUENCE:
-      sample_lc(time, lc, daily=, weekly=, season=, index=):
+      sample_lc(time, lc, daily=, weekly=, season=, index=, sealen=, seagap=,
+                nyear=, nvisit=, dvisit=):
 
     INPUTS:
       time - time vector in days
-      lc   - intrinsic light curve
+      lc   - intrinsic light curve, or a stack of light curves of shape
+             (ncurve, ntime) on the same time vector
 
     OPTIONAL INPUTS:
-      index - user defined indices at which the light curve is to be sampled
+      index  - user defined indices at which the light curve is to be sampled
+      sealen - length of an observing season in days (default 120)
+      seagap - gap between seasons in days (default 365-sealen)
+      nyear  - number of years (seasons) of observations (default all)
+      nvisit - number of visits per night (default 1)
+      dvisit - time between visits in a night in days (default 1 hour)
 
     KEYWORDS:
       daily  - daily sampling
@@ -28,53 +46,257 @@ def lc_sample(time, lc, daily=None, weekly=None, season=None, index=None):
 
     OUTPUTS:
       time_samp - input time vector sampled at appropriate points
-      lc_samp   - input light curve sampled at appropriate points
+      lc_samp   - input light curve(s) sampled at appropriate points
 
     OPTIONAL OUTPUTS:
 
     EXAMPLES:
 
     COMMENTS:
+      See lc_sample_index.  The cadence indices are looked up in (or
+      added to) the process-wide cache of lc_sample_schedule.
 
     REVISION HISTORY:
       2013/02/14 - Written by Greg Dobler (KITP/UCSB)
+      2026/10/17 - Vectorized cadence engine, stacks of light curves
+      2026/10/17 - Cached cadence indices
+
+    ------------------------------------------------------------
+    """
+
+# -------- user defined or cadence sampling
+    if index is None:
+        index = lc_sample_schedule(time, daily=daily, weekly=weekly, \
+                                       season=season, sealen=sealen, \
+                                       seagap=seagap, nyear=nyear, \
+                                       nvisit=nvisit, dvisit=dvisit)[1]
+
+
+    return time[index], lc[..., index]
+
+
+
+def lc_sample_index(time, daily=None, weekly=None, season=None, sealen=None, \
+                        seagap=None, nyear=None, nvisit=None, dvisit=None, \
+                        tmin=None):
+
+    """
+    NAME:
+      lc_sample_index
+
+    PURPOSE:
+      Return the indices of an intrinsic time vector at which it is
+      sampled with a given cadence.
+
+    CALLING SEQUENCE:
+      index = lc_sample_index(time, daily=, weekly=, season=, sealen=,
+                              seagap=, nyear=, nvisit=, dvisit=, tmin=)
+
+    INPUTS:
+      time - (uniform, increasing) time vector in days
+
+    OPTIONAL INPUTS:
+      tmin - only epochs >= tmin are sampled (e.g. the end of the previous
+             chunk of a long curve, see lc_sample_iter)
+      see lc_sample for the others
+
+    KEYWORDS:
+      see lc_sample
+
+    OUTPUTS:
+      index - indices of the sampled points (increasing)
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+
+    COMMENTS:
+      The epochs of the cadence (see lc_cadence) are located on the grid
+      with np.searchsorted and matched to the nearest grid point within
+      half a time step, so nothing scales with more than the grid size
+      and no per-season loop is needed.  Visits that fall on the same
+      grid point are kept once.  Without daily or weekly set, every grid
+      point is sampled (with the season gap applied if season is set).
+      Epochs beyond the grid (e.g. for a chunk of a longer curve) are
+      not generated, so the work of a chunk scales with its size.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - Added tmin
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    sealen = 120. if sealen==None else sealen
+    seagap = 365. - sealen if seagap==None else seagap
+
+    ntime = time.size
+    dt    = time[1] - time[0] if ntime > 1 else 1.0
+    tmax  = time[-1] + 0.5*dt
+    if nyear: tmax = min(nyear*(sealen + seagap), tmax)
+
+
+
+# -------- every grid point (with season gap if desired)
+    if not (daily or weekly):
+        keep = time < tmax
+        if season: keep &= (time % (sealen + seagap)) < sealen
+        if tmin!=None: keep &= time >= tmin
+
+        return np.where(keep)[0]
+
+
+
+# -------- locate the cadence epochs on the grid
+    tsamp = lc_cadence(daily=daily, weekly=weekly, season=season, \
+                           tmax=tmax, sealen=sealen, seagap=seagap, \
+                           nvisit=nvisit, dvisit=dvisit, tmin=tmin)
+
+    index = np.clip(np.searchsorted(time, tsamp), 1, max(ntime-1, 1))
+    left  = (tsamp - time[index-1]) < (time[index] - tsamp)
+    index = np.where(left, index-1, index)
+    keep  = np.abs(time[index] - tsamp) <= 0.5*dt + 1e-5
+
+
+    return np.unique(index[keep])
+
+
+
+def lc_sample_schedule(time, daily=None, weekly=None, season=None, \
+                           index=None, sealen=None, seagap=None, nyear=None, \
+                           nvisit=None, dvisit=None, tmin=None):
+
+    """
+    NAME:
+      lc_sample_schedule
+
+    PURPOSE:
+      Return the cadence indices of a time grid (see lc_sample_index)
+      from a process-wide cache, with the identity of the schedule.
+
+    CALLING SEQUENCE:
+      sid, index = lc_sample_schedule(time, daily=, weekly=, season=,
+                                      index=, sealen=, seagap=, nyear=,
+                                      nvisit=, dvisit=, tmin=)
+
+    INPUTS:
+      time - (uniform, increasing) time vector in days
+
+    OPTIONAL INPUTS:
+      index - user defined indices (a custom schedule, cached as is)
+      see lc_sample_index for the others
+
+    KEYWORDS:
+      see lc_sample
+
+    OUTPUTS:
+      sid   - identity of the schedule (a positive 60 bit integer, the
+              same for the same grid and cadence in any process)
+      index - indices of the sampled points (read-only)
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      sid, index = lc_sample_schedule(time, daily=1, season=1)
+
+    COMMENTS:
+      Entries are keyed by the grid (first time, time step, size and
+      last time), the cadence keywords and the hash of a custom
+      schedule, so every curve on the same grid with the same cadence
+      shares one index array.  The keywords are keyed with their
+      defaults filled in and numbers as floats, and only as far as they
+      change the schedule: sealen and seagap with season set, nyear as
+      the end of the survey, and nvisit and dvisit with daily or weekly
+      set.  The grid itself is
+      not compared, which is why time must be uniform (as lc_sample_index
+      requires).  The cache holds the nmax most recently used entries
+      (see lc_sample_cache).
+
+    REVISION HISTORY:
+      2026/10/17 - Written
 
     ------------------------------------------------------------
     """
 
-# -------- user defined sampling
-    if index!=None:
-        return time[index], lc[index]
+# -------- the key of the schedule
+    ntime = time.size
+    grid  = (float(time[0]), float(time[1] - time[0]), ntime, \
+                 float(time[-1])) if ntime > 1 else (tuple(time), ntime)
+
+    if index is not None:
+        index = np.asarray(index)
+        key   = grid + ('index', hashlib.sha1(index.astype(np.int64) \
+                                                  .tostring()).hexdigest())
+    else:
+        sealen = 120. if sealen==None else float(sealen)
+        seagap = 365. - sealen if seagap==None else float(seagap)
+        nyear  = float(nyear) if nyear else None
+        nvisit = 1 if nvisit==None else int(nvisit)
+        dvisit = 1./24. if dvisit==None else float(dvisit)
+        tmin   = None if tmin==None else float(tmin)
+        visits = (nvisit, dvisit if nvisit > 1 else None) if daily or \
+            weekly else (1, None)
+        gaps   = (sealen, seagap) if season else (None, None)
+        tend   = nyear*(sealen + seagap) if nyear else None
+        key    = grid + (bool(daily), bool(weekly), bool(season), tend, \
+                             tmin) + gaps + visits
+
+    key = int(hashlib.sha1(repr(key)).hexdigest()[:15], 16)
+
+
+
+# -------- look up the indices
+    with _schedule_lock:
+        if key in _schedule_cache:
+            _schedule_state['hits'] += 1
+            _schedule_cache[key] = _schedule_cache.pop(key)
+
+            return key, _schedule_cache[key]
+
+        _schedule_state['misses'] += 1
+
+
 
+# -------- compute (outside the lock) and store the indices
+    if index is None:
+        index = lc_sample_index(time, daily=daily, weekly=weekly, \
+                                    season=season, sealen=sealen, \
+                                    seagap=seagap, nyear=nyear, \
+                                    nvisit=nvisit, dvisit=dvisit, tmin=tmin)
+    else:
+        index = index.copy()
 
+    index.flags.writeable = False
 
-# -------- initialize sampled light curve
-    time_samp, lc_samp = time, lc
+    with _schedule_lock:
+        if _schedule_state['nmax'] > 0: _schedule_cache[key] = index
 
+        while len(_schedule_cache) > _schedule_state['nmax']:
+            _schedule_cache.popitem(last=False)
 
 
-# -------- sampling
-    if daily:
-        index = np.where((time*1e5).round() % 1.0e5 == 0)
-    elif weekly:
-        index = np.where((time*1e5).round() % 7.0e5 == 0)
+    return key, index
 
-    time_samp, lc_samp = time[index], lc[index]
 
 
+def lc_sample_cache(nmax=None, clear=None):
 
-# -------- create season gap (seasons are 120 days on 365-120=245 days off)
-    if season:
-        tstart = 365.*np.arange(10.)
-        tend   = tstart + 120.
-        nsea   = tstart.size
+    """ Set the number of entries of the process-wide cache of cadence
+        indices (nmax, default 32, 0 disables it) or empty it (clear),
+        and return its statistics: nentry, nmax, hits, misses and mbytes
+        (see lc_sample_schedule) """
 
-        for isea in np.arange(nsea):
-            tind  = np.where((time_samp >= tstart[isea]) & \
-                                 (time_samp < tend[isea]))[0]
-            index = tind if isea==0 else np.concatenate([index,tind])
+    with _schedule_lock:
+        if nmax is not None: _schedule_state['nmax'] = int(nmax)
 
-        time_samp, lc_samp = time_samp[index], lc_samp[index]
+        if clear:
+            _schedule_cache.clear()
+            _schedule_state['hits'] = _schedule_state['misses'] = 0
 
+        while len(_schedule_cache) > _schedule_state['nmax']:
+            _schedule_cache.popitem(last=False)
 
-    return time_samp, lc_samp
+        return dict(_schedule_state, nentry=len(_schedule_cache), \
+                        mbytes=sum([index.nbytes for index in \
+                                        _schedule_cache.values()])/1024.**2)
@@ -1,5 +1,7 @@
 import numpy as np
-from scipy import interpolate
+from lc_lazy import *
+
+interpolate = lc_lazy('scipy.interpolate')
 
 def lc_spline(x, y, xr=None, nx=None, wgt=None):
 
@@ -58,3 +60,121 @@ def lc_spline(x, y, xr=None, nx=None, wgt=None):
     y_sp = interpolate.splev(x_sp , tck, der=0)
 
     return x_sp, y_sp
+
+
+
+def lc_spline_season(x, ys, sig=None, x_sp=None, gap=None, s=None, k=None):
+
+    """
+    NAME:
+      lc_spline_season
+
+    PURPOSE:
+      Reconstruct sampled light curves with weighted smoothing splines
+      fit separately to each observing season.
+
+    CALLING SEQUENCE:
+      y_sp = lc_spline_season(x, ys, sig=, x_sp=, gap=, s=, k=)
+
+    INPUTS:
+      x  - sampled times (increasing) [day]
+      ys - sampled light curve [mag], or a stack of light curves of shape
+           (ncurve, nsamp) on the same times (e.g. the images of a system)
+
+    OPTIONAL INPUTS:
+      sig     - 1 sigma errors [mag]: a scalar, one per sample or one per
+                curve and sample (default 1.0857*0.03, i.e. 3% in flux)
+      x_sp    - times at which to evaluate the splines (default x)
+      gap     - minimum gap between seasons [day] (default 10 times the
+                median sampling interval)
+      s       - smoothing factor of each season, as a multiple of the
+                number of points in the season (default 1, the expected
+                chi^2)
+      k       - spline degree (default 3, lowered for short seasons)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      y_sp - splined light curve(s) at x_sp, shape (nx_sp,) or 
+             (ncurve, nx_sp); NaN at times outside every season
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      seven day sampling with 3% flux errors, evaluated at 0.5 dy:
+      y_sp = lc_spline_season(lc.time_samp, lc.lc_samp + lc.noise,
+                              sig=1.0857*lc.amp_n,
+                              x_sp=np.arange(0., 3650., 0.5))
+
+    COMMENTS:
+      Seasons are runs of samples separated by more than gap, and each
+      season of each curve is fit with scipy.interpolate.splrep with
+      weights 1/sig.  The splines are never evaluated across a gap,
+      and the cost scales with the number of samples and of requested
+      points only (not with the intrinsic grid).
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    x    = np.asarray(x, dtype=float)
+    ys   = np.asarray(ys, dtype=float)
+    x_sp = x if x_sp is None else np.atleast_1d(np.asarray(x_sp, \
+                                                            dtype=float))
+    sig  = 1.0857*0.03 if sig is None else sig
+    s    = 1.0 if s==None else s
+    k    = 3 if k==None else k
+
+    dx  = np.diff(x)
+    gap = 10.*np.median(dx) if gap==None and dx.size else gap
+
+
+
+# -------- utilities
+    ycurve = np.atleast_2d(ys)
+    ncurve = ycurve.shape[0]
+    wcurve = np.broadcast_to(1.0/np.asarray(sig, dtype=float), \
+                                 ycurve.shape)
+    y_sp   = np.empty([ncurve, x_sp.size])
+    y_sp.fill(np.nan)
+
+
+
+# -------- split the samples into seasons and find the requested points
+#          in each season
+    edge  = np.concatenate([[0], np.where(dx > gap)[0] + 1, [x.size]]) \
+        if x.size else np.zeros(1, dtype=int)
+    first = np.searchsorted(x_sp, x[edge[:-1]], side='left')
+    last  = np.searchsorted(x_sp, x[edge[1:] - 1], side='right')
+
+
+
+# -------- fit and evaluate one season of one curve
+    def fit(icurve, isea):
+        lo, hi = edge[isea], edge[isea+1]
+        npts   = hi - lo
+        y      = ycurve[icurve, lo:hi]
+
+        if npts==1:
+            y_sp[icurve, first[isea]:last[isea]] = y[0]
+            return
+
+        kdeg = min(k, npts - 1)
+        tck  = interpolate.splrep(x[lo:hi], y, w=wcurve[icurve, lo:hi], \
+                                      k=kdeg, s=s*npts)
+
+        y_sp[icurve, first[isea]:last[isea]] = \
+            interpolate.splev(x_sp[first[isea]:last[isea]], tck)
+
+
+
+# -------- fit all seasons of all curves (FITPACK holds the GIL, so
+#          threads would not run the fits in parallel)
+    for icurve in range(ncurve):
+        for isea in range(edge.size - 1): fit(icurve, isea)
+
+
+    return y_sp if ys.ndim > 1 else y_sp[0]
@@ -0,0 +1,323 @@
+import numpy as np
+import os
+import tempfile
+from lc_sample import *
+from lc_noise import *
+from lc_write import *
+from lc_metrics import *
+from lc_rng import *
+from lc_lazy import *
+
+signal = lc_lazy('scipy.signal')
+
+def lc_car_iter(seed, meanmag=None, mag0=None, year=None, tau=None, \
+                    sigma=None, lores=None, medres=None, chunk=None, rng=None):
+
+    """
+    NAME:
+      lc_car_iter
+
+    PURPOSE:
+      Generate a CAR(1) light curve of any length as a sequence of
+      consecutive chunks, so that memory does not grow with the duration
+      or the resolution of the curve.
+
+    CALLING SEQUENCE:
+      for time, lc in lc_car_iter(seed, meanmag=, mag0=, year=, tau=,
+                                  sigma=, lores=, medres=, chunk=, rng=):
+          ...
+
+    INPUTS:
+      seed - the seed for the random draws (see lc_rng)
+
+    OPTIONAL INPUTS:
+      meanmag - mean magnitude of the light curve (default 20)
+      mag0    - initial magnitude of the light curve (default meanmag)
+      year    - number of years to generate (default 10, np.inf for a
+                stream without end)
+      tau     - relaxation time in days (default 10^2.5)
+      sigma   - in mag/day^(1/2) (default 8e-3)
+      chunk   - length of a chunk in days (default 365)
+      rng     - a numpy Generator (or RandomState) to draw from instead of
+                the generator derived from seed
+
+    KEYWORDS:
+      lores  - use 1.0 dy sampling instead of 0.01 dy
+      medres - use 0.1 dy sampling instead of 0.01 dy
+
+    OUTPUTS:
+      time - time vector of the chunk in days
+      lc   - light curve of the chunk in magnitudes
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      a century at 0.01 dy, sampled daily with noise and written as it is
+      generated:
+
+      chunks = lc_car_iter(111, year=100.)
+      with lc_good_stream('century_good.txt', ascii=1, clobber=1) as gs:
+          for tsamp, lsamp, noise in lc_sample_iter(chunks, 222, daily=1):
+              gs.append(tsamp, [lsamp + noise])
+
+    COMMENTS:
+      The chunks are those of the default (recursive) method of
+      lc_car_gen: the recursion is carried from chunk to chunk as the
+      state of the filter and the draws are successive draws of one
+      generator, so the concatenated chunks equal lc_car_gen with the
+      same parameters.  Only one chunk is held in memory.  The fft and
+      reference methods need the whole curve and are not available.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults (as lc_car_gen)
+    lc_log('LC_CAR_ITER: Using seed = ' + str(seed))
+
+    if not meanmag : meanmag = 20.0
+    if not mag0    : mag0    = meanmag
+    if not year    : year    = 10L
+    if not tau     : tau     = 10.**2.5 # [day]
+    if not sigma   : sigma   = 8e-3 # [mag day^-1/2]
+
+
+
+# -------- the grid and its chunks
+    resfac = 1L if lores else 10L if medres else 100L
+
+    duration = None if np.isinf(year) else long(365L*resfac*year)
+    nchunk   = max(long(round(resfac*(365. if chunk==None else chunk))), 2L)
+
+
+
+# -------- convert tau and sigma
+    tau   *= float(resfac) # [day/resfac]
+    sigma /= np.sqrt(float(resfac)) # [mag (day/resfac)^1/2]
+
+
+
+# -------- generate the chunks, carrying the state of the recursion
+    gen   = lc_rng(seed, 'curve', rng=rng)
+    decay = np.exp(-1.0/tau)
+    state = np.zeros(1)
+    itime = 0L
+
+    while duration is None or itime < duration:
+
+        # size of the chunk (a last chunk of a single point is merged
+        # into the previous one so that every chunk has a time step)
+        ntime = nchunk if duration is None else min(nchunk, duration-itime)
+        if duration is not None and duration - itime - ntime == 1: ntime += 1
+
+        time = np.arange(itime, itime+ntime, 1.0)
+        rf   = sigma*(1.0*gen.standard_normal(ntime))
+
+        ylc, state = signal.lfilter([0.0, decay], [1.0, -decay], rf, zi=state)
+
+        lc  = mag0*np.exp(-time/tau) + meanmag*(1.0 - np.exp(-time/tau))
+        lc += ylc
+
+        time  /= float(resfac)
+        itime += ntime
+
+        yield time, lc
+
+
+
+def lc_sample_iter(chunks, seed_n, daily=None, weekly=None, season=None, \
+                       amp_n=None, sealen=None, seagap=None, nyear=None, \
+                       nvisit=None, dvisit=None, rng=None):
+
+    """
+    NAME:
+      lc_sample_iter
+
+    PURPOSE:
+      Sample a light curve delivered in chunks (see lc_car_iter) with a
+      cadence and add a noise realization, chunk by chunk.
+
+    CALLING SEQUENCE:
+      for time_samp, lc_samp, noise in lc_sample_iter(chunks, seed_n,
+                                                      daily=, ...):
+          ...
+
+    INPUTS:
+      chunks - iterable of consecutive (time, lc) chunks of a uniform grid
+      seed_n - seed for the noise (see lc_noise)
+
+    OPTIONAL INPUTS:
+      amp_n - percent errors in flux units (default is 3%)
+      rng   - a numpy Generator (or RandomState) for the noise instead of
+              the generator derived from seed_n
+      see lc_sample for the cadence keywords
+
+    KEYWORDS:
+      see lc_sample
+
+    OUTPUTS:
+      time_samp - sampled times of the chunk
+      lc_samp   - sampled light curve of the chunk
+      noise     - noise realization of the chunk in Delta magnitudes
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      see lc_car_iter
+
+    COMMENTS:
+      Each chunk samples the epochs between the end of the previous chunk
+      and half a time step past its last point, so every epoch is
+      sampled once and the samples are those of lc_sample on the whole
+      curve.  The noise is drawn from one generator for all chunks and
+      equals lc_noise on the whole sampled curve.  With nyear set, the
+      iteration stops after the last observing year (so chunks may come
+      from a stream without end).  The indices of each chunk come from
+      lc_sample_index directly: every chunk is on a grid of its own, so
+      the cache of lc_sample_schedule would only fill up with entries
+      that are never reused.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    sealen = 120. if sealen==None else sealen
+    seagap = 365. - sealen if seagap==None else seagap
+    tend   = nyear*(sealen + seagap) if nyear else None
+    gen    = lc_rng(seed_n, 'noise', rng=rng)
+    tmin   = None
+
+
+
+# -------- sample and add noise chunk by chunk
+    for time, lc in chunks:
+        if tend is not None and time[0] >= tend: return
+
+        index = lc_sample_index(time, daily=daily, weekly=weekly, \
+                                    season=season, sealen=sealen, \
+                                    seagap=seagap, nyear=nyear, \
+                                    nvisit=nvisit, dvisit=dvisit, tmin=tmin)
+
+        # the next chunk starts where this one ends (see lc_sample_index)
+        tmin = time[-1] + 0.5*(time[1] - time[0])
+
+        lc_samp = lc[index]
+
+        yield time[index], lc_samp, lc_noise(lc_samp, seed_n, amp_n=amp_n, \
+                                                  rng=gen)
+
+
+
+class lc_good_stream(object):
+
+    """
+      Writer of a 'good' file (see lc_write) whose rows are appended in
+      chunks, e.g. from lc_sample_iter.  Ascii files are written as the
+      rows come.  The fits 'good' convention is a single row of vector
+      columns whose length must be known in advance, so the columns are
+      spooled to temporary files and the table is written on close (the
+      sampled curves are then read back, the intrinsic curve never is).
+
+        with lc_good_stream('good.fits', errlcs=[0.03], clobber=1) as gs:
+            for tsamp, lsamp, noise in lc_sample_iter(chunks, 222, daily=1):
+                gs.append(tsamp, [lsamp + noise])
+    """
+
+# -------- open the file
+    def __init__(self, filename, errlcs=None, path=None, clobber=None, \
+                     ascii=None):
+
+        """ Open the file (errors in % of flux, default 3%) """
+
+        out = (path if path else '') + filename
+
+        if os.path.exists(out) and not clobber:
+            raise IOError("LC_GOOD_STREAM: file {0} exists " \
+                              "(use clobber=1)".format(out))
+
+        lc_log("LC_GOOD_STREAM: Streaming light curves to file " + out)
+
+        self.filename = out
+        self.errlcs   = errlcs
+        self.ascii    = ascii
+        self.nlc      = None
+        self.npts     = 0
+        self.spool    = []
+        self.fout     = open(out, 'w', 2**20) if ascii else None
+
+
+# -------- append rows
+    @lc_timed('lc_good_stream.append')
+    def append(self, time, lcs):
+
+        """ Append the rows of a chunk of up to four sampled lightcurves
+            [mag] """
+
+        if not isinstance(lcs, list): lcs = [lcs]
+
+        if self.nlc is None:
+            if len(lcs) > 4:
+                print "\nLC_GOOD_STREAM ERROR: number of lightcurves per " + \
+                    "system cannot exceed four."
+                return
+
+            self.nlc = len(lcs)
+
+            if self.ascii: lc_good_ascii_header(self.fout, self.nlc)
+            else: self.spool = [tempfile.TemporaryFile() for ispool in \
+                                    range(1 + self.nlc)]
+
+        if len(lcs)!=self.nlc:
+            print "\nLC_GOOD_STREAM ERROR: number of lightcurves changed " + \
+                "from {0} to {1}".format(self.nlc, len(lcs))
+            return
+
+        if self.ascii:
+            lc_good_ascii_rows(self.fout, time, lcs, errlcs=self.errlcs)
+        else:
+            for spool, col in zip(self.spool, [time] + lcs):
+                np.asarray(col, dtype=np.float64).tofile(spool)
+
+        self.npts += time.size
+
+
+# -------- write the table (fits) and close
+    def close(self):
+
+        """ Close the file (writing the fits table from the spools) """
+
+        if self.fout is not None:
+            if not self.fout.closed: self.fout.close()
+            return
+
+        if self.nlc is None: return
+
+        cols = []
+        for spool in self.spool:
+            spool.seek(0)
+            cols.append(np.fromfile(spool, dtype=np.float64))
+            spool.close()
+
+        lc_write(cols[0], cols[1:], 'good', self.filename, \
+                     errlcs=self.errlcs, clobber=1)
+
+        self.nlc = None
+
+
+# -------- context manager
+    def __enter__(self):
+
+        """ Enter a with block """
+
+        return self
+
+    def __exit__(self, *args):
+
+        """ Close the file at the end of a with block """
+
+        self.close()
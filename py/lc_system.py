@@ -0,0 +1,302 @@
+import numpy as np
+import copy as cp
+from lc_lightcurve import *
+from lc_sample import *
+from lc_add_tdelay import *
+from lc_write import *
+from lc_spline import *
+from lc_metrics import *
+from lc_rng import *
+
+class lc_system(object):
+
+    """
+      Lensed system of up to four images (A, B, C, D) of one intrinsic
+      light curve.  The system holds a single lightcurve instance (the
+      intrinsic realization, see lc_lightcurve) and each image is that
+      curve delayed by tdelay[k], stored only as an offset (in grid
+      steps) into the shared backing buffer, so a quad costs about as
+      much memory as a single curve.  Sampling and noise are applied to
+      all images at once:
+        time_samp : sampled times (common to all images)
+        lc_samp   : sampled light curves, shape (nimage, nsamp)
+        noise     : noise realizations, shape (nimage, nsamp), image k
+                    with seed seed_n + k (or drawn in turn from rng, see
+                    lightcurve)
+
+        sys = lc_system(111, 222, tdelay=[0., 14.7, -5., 21.])
+        sys.car_gen(medres=1)
+        sys.sample(weekly=1, season=1)
+        sys.write('tdc_0', clobber=1)
+
+      Delays which are a multiple of the time resolution give exactly
+      the curves of lightcurve.add_tdelay (including its wrapping of
+      the buffer).  Other delays require subgrid='bridge' or 'fourier'
+      (see lc_add_tdelay), else a ValueError is raised when the delayed
+      curves are first needed, and the delayed curve of those images is
+      stored on its own.  image(k) returns a full lightcurve instance of
+      image k (e.g. to write an evil file).
+    """
+
+    __slots__ = ['curve', 'tdelay', 'subgrid', 'label', 'time_samp', \
+                     'lc_samp', 'noise', 'index', 'daily', 'weekly', \
+                     'season', 'seed_n', 'amp_n', 'time_sp', 'lc_sp', \
+                     'usrind', '_bufs']
+
+# -------- initialize the intrinsic light curve and the images
+    def __init__(self, seed, seed_n, tdelay=None, subgrid=None, \
+                     meanmag=None, mag0=None, tau=None, sigma=None, \
+                     amp_n=None, cache=None, compact=None, single=None, \
+                     rng=None):
+
+        """ Initialize the intrinsic light curve (see lightcurve) and the
+            delays of the images in days (default [0,0]) """
+
+        # delays of the images
+        self.tdelay = np.atleast_1d([0.0, 0.0] if tdelay is None else \
+                                        tdelay).astype(float)
+
+        if self.tdelay.size > 4:
+            raise ValueError("LC_SYSTEM: number of images per system " \
+                                 "cannot exceed four.")
+
+        if subgrid not in [None, 'bridge', 'fourier']:
+            raise ValueError("LC_SYSTEM: subgrid '{0}' not understood, " \
+                                 "only 'bridge' or 'fourier' are valid." \
+                                 .format(subgrid))
+
+        self.subgrid = subgrid
+        self.label   = ['A','B','C','D'][:self.tdelay.size]
+
+        # the intrinsic light curve
+        self.curve = lightcurve(seed, seed_n, meanmag=meanmag, mag0=mag0, \
+                                    tau=tau, sigma=sigma, amp_n=amp_n, \
+                                    cache=cache, compact=compact, \
+                                    single=single, rng=rng)
+
+        self.seed_n = self.curve.seed_n
+        self.amp_n  = self.curve.amp_n
+        self.reset()
+
+
+# -------- reset the delayed and sampled curves
+    def reset(self):
+
+        """ Reset the delayed (sub-grid) and sampled curves """
+
+        self._bufs     = [None]*self.tdelay.size
+        self.time_samp = self.lc_samp = self.noise = self.index = None
+        self.time_sp   = self.lc_sp   = self.usrind = None
+        self.daily     = self.weekly = self.season = 0
+
+
+# -------- generate the intrinsic light curve
+    @lc_timed('lc_system.car_gen')
+    def car_gen(self, medres=None, fft=None, pad=None, cache=None):
+
+        """ Generate the intrinsic light curve at high (default) or
+            medium resolution (see lightcurve.car_gen) """
+
+        self.curve.car_gen(medres=medres, fft=fft, pad=pad, cache=cache)
+        self.reset()
+
+
+# -------- backing buffer and offset of an image
+    def buffer(self, iimg):
+
+        """ Return the backing buffer of image iimg and its offset in grid
+            steps: the shared buffer and the delay for delays on the grid,
+            else the delayed buffer (computed once) and no offset """
+
+        curve        = self.curve
+        nshift, frac = lc_add_tdelay_shift(self.tdelay[iimg], curve.dt, \
+                                               subgrid=self.subgrid)
+
+        if not frac:
+            if abs(nshift) > curve.nbuff:
+                print "LC_SYSTEM: image {0} delay exceeds the buffer " \
+                    "({1} dy), the curve wraps".format(self.label[iimg], \
+                                                       curve.nbuff*curve.dt)
+            return curve._buf, nshift
+
+        # (lc_add_tdelay would leave the curve undelayed)
+        if self.subgrid not in ['bridge', 'fourier']:
+            raise ValueError("LC_SYSTEM: image {0} delay of {1} dy is not " \
+                                 "a multiple of the time resolution ({2} " \
+                                 "dy), use subgrid='bridge' or 'fourier'." \
+                                 .format(self.label[iimg], \
+                                             self.tdelay[iimg], curve.dt))
+
+        if self._bufs[iimg] is None:
+            buf = curve._buf.copy()
+            lc_add_tdelay(curve.time, buf, self.tdelay[iimg], \
+                              subgrid=self.subgrid, meanmag=curve.meanmag, \
+                              tau=curve.tau, sigma=curve.sigma, \
+                              seed=curve.seed, rng=curve.rng)
+            self._bufs[iimg] = buf
+
+        return self._bufs[iimg], 0
+
+
+# -------- intrinsic light curves of the images at given grid indices
+    def lc(self, index=None):
+
+        """ Return the delayed intrinsic light curves of all images at the
+            grid indices index (default all), shape (nimage, nindex) """
+
+        # utilities
+        curve = self.curve
+        nbuf  = curve._buf.size
+        index = np.arange(nbuf - curve.nbuff) if index is None else \
+            np.asarray(index)
+        lcs   = np.empty([self.tdelay.size, index.size], \
+                             dtype=curve._buf.dtype)
+
+        # gather the images on the grid from the shared buffer in one pass
+        # (a delay of s steps reads the buffer s steps earlier, wrapping
+        # as np.roll does)
+        bufs  = [self.buffer(iimg) for iimg in range(self.tdelay.size)]
+        grid  = [iimg for iimg in range(len(bufs)) if bufs[iimg][0] is \
+                     curve._buf]
+
+        if grid:
+            shift     = np.array([bufs[iimg][1] for iimg in grid])
+            ind       = (curve.nbuff - shift[:,np.newaxis] + index) % nbuf
+            lcs[grid] = curve._buf[ind]
+
+        # the sub-grid images from their own buffers
+        for iimg in range(len(bufs)):
+            if iimg not in grid: lcs[iimg] = bufs[iimg][0][curve.nbuff+index]
+
+        return lcs
+
+
+# -------- sample all images and add noise realizations
+    @lc_timed('lc_system.sample')
+    def sample(self, daily=None, weekly=None, season=None, index=None, \
+                   amp_n=None, seed_n=None, sealen=None, seagap=None, \
+                   nyear=None, nvisit=None, dvisit=None):
+
+        """ Sample all images with the same cadence and add a noise
+            realization to each (image k with seed seed_n + k, see
+            lc_sample for the cadence keywords and lc_noise for the
+            noise) """
+
+        # the cadence (common to all images, see lc_sample_schedule)
+        sid, index = lc_sample_schedule(self.curve.time, daily=daily, \
+                                            weekly=weekly, season=season, \
+                                            index=index, sealen=sealen, \
+                                            seagap=seagap, nyear=nyear, \
+                                            nvisit=nvisit, dvisit=dvisit)
+
+        self.usrind    = np.array([sid], dtype=np.int64)
+        self.index     = index
+        self.time_samp = self.curve.time[self.index]
+        self.lc_samp   = self.lc(self.index)
+
+        # generate the noise realizations (image k with seed seed_n + k)
+        if amp_n:  self.amp_n  = amp_n
+        if seed_n: self.seed_n = seed_n
+
+        self.noise = np.array([lc_noise(self.lc_samp[iimg], \
+                                            self.seed_n + iimg, \
+                                            amp_n=self.amp_n, \
+                                            rng=self.curve.rng) \
+                                   for iimg in range(self.tdelay.size)])
+
+        # set the sampling flags appropriately
+        self.daily  = 1 if daily else 0
+        self.weekly = 1 if weekly else 0
+        self.season = 1 if season else 0
+
+        # reset splines since they no longer apply
+        self.time_sp = self.lc_sp = None
+
+
+# -------- batches of noise realizations of the sampled images
+    @lc_timed('lc_system.noise_batch')
+    def noise_batch(self, nreal, amp_n=None):
+
+        """ Return nreal noise realizations of each sampled image, shape
+            (nimage, nreal, nsamp), without re-sampling the images (image
+            k with seed seed_n + k, see lc_noise; the first realization
+            of each image is noise) """
+
+        amp_n = self.amp_n if amp_n==None else amp_n
+
+        return np.array([lc_noise(self.lc_samp[iimg], self.seed_n + iimg, \
+                                      amp_n=amp_n, rng=self.curve.rng, \
+                                      nreal=nreal) \
+                             for iimg in range(self.tdelay.size)])
+
+
+# -------- reconstruct the sampled images with seasonal splines
+    @lc_timed('lc_system.spline')
+    def spline(self, time_sp=None):
+
+        """ Fit smoothing splines to each season of each sampled image
+            (with noise) and evaluate them at time_sp (default time_samp),
+            see lc_spline_season; lc_sp has shape (nimage, ntime_sp) """
+
+        self.time_sp = self.time_samp if time_sp is None else \
+            np.asarray(time_sp, dtype=float)
+        self.lc_sp   = lc_spline_season(self.time_samp, self.lc_samp + \
+                                            self.noise, \
+                                            sig=1.0857*self.amp_n, \
+                                            x_sp=self.time_sp)
+
+
+# -------- a lightcurve instance of an image
+    @lc_timed('lc_system.image')
+    def image(self, iimg):
+
+        """ Return a lightcurve instance of image iimg (the delayed
+            intrinsic curve and, if sampled, its sampled curve and noise)
+            as from lightcurve.add_tdelay and lightcurve.sample """
+
+        # share the parameters, copy the delayed backing buffer
+        img   = cp.copy(self.curve)
+        buf, shift = self.buffer(iimg)
+
+        img._buf    = np.roll(buf, shift) if shift else buf.copy()
+        img.tdelay  = self.tdelay[iimg]
+        img.usrind  = self.usrind
+
+        # sampled curve and noise
+        if self.index is None:
+            img.time_samp = img.lc_samp = img.noise = None
+        else:
+            img.time_samp = self.time_samp
+            img.lc_samp   = self.lc_samp[iimg]
+            img.noise     = self.noise[iimg]
+            img.seed_n    = self.seed_n + iimg
+            img.amp_n     = self.amp_n
+            img.daily     = self.daily
+            img.weekly    = self.weekly
+            img.season    = self.season
+
+        # splines, if any
+        if self.lc_sp is None:
+            img.time_sp = img.lc_sp = None
+        else:
+            img.time_sp = self.time_sp
+            img.lc_sp   = self.lc_sp[iimg]
+
+        return img
+
+
+# -------- write the evil files of the images and the good file
+    @lc_timed('lc_system.write')
+    def write(self, root, path=None, clobber=None, ascii=None):
+
+        """ Write <root>_evil_<label>.fits for each image and the good
+            file <root>_good.fits (.txt if ascii) of the sampled system """
+
+        for iimg in range(self.tdelay.size):
+            self.image(iimg).write(root + '_evil_' + self.label[iimg] + \
+                                       '.fits', path=path, clobber=clobber)
+
+        lc_write(self.time_samp, list(self.lc_samp + self.noise), 'good', \
+                     root + '_good' + ('.txt' if ascii else '.fits'), \
+                     errlcs=[self.amp_n]*self.tdelay.size, path=path, \
+                     clobber=clobber, ascii=ascii)
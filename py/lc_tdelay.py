@@ -0,0 +1,528 @@
+import numpy as np
+import multiprocessing as mp
+from lc_goodfile import *
+from lc_metrics import *
+from lc_lazy import *
+
+fits = lc_lazy('pyfits')
+
+@lc_timed('lc_tdelay')
+def lc_tdelay(time, lcA, lcB, errA=None, errB=None, timeB=None, \
+                  method=None, delays=None, offsets=None, gap=None, \
+                  nmin=None, refine=None):
+
+    """
+    NAME:
+      lc_tdelay
+
+    PURPOSE:
+      Estimate the time delay between two sampled light curves by
+      evaluating an objective function over a grid of trial delays (and
+      magnitude offsets) in a single array computation.
+
+    CALLING SEQUENCE:
+      tbest, terr, delays, curve = lc_tdelay(time, lcA, lcB, errA=, errB=,
+                                             timeB=, method=, delays=,
+                                             offsets=, gap=, nmin=, refine=)
+
+    INPUTS:
+      time - sampled times of image A (and of B if timeB is not input) [day]
+      lcA  - sampled light curve of image A (e.g. lc_samp + noise) [mag]
+      lcB  - sampled light curve of image B [mag]
+
+    OPTIONAL INPUTS:
+      errA    - 1 sigma errors of A [mag], scalar or one per sample
+                (default 1.0857*0.03, i.e. 3% in flux)
+      errB    - 1 sigma errors of B [mag] (default errA)
+      timeB   - sampled times of image B if different from A [day]
+      method  - objective function:
+                  'chi2' - chi^2 of B against A linearly interpolated at
+                           the delayed times (default)
+                  'disp' - dispersion of the combined curve (Pelt et al.
+                           1996, D^2 from neighbouring A-B pairs)
+                  'xcor' - interpolated cross-correlation coefficient
+      delays  - trial delays of B with respect to A [day] (default -120
+                to 120 dy in steps of 1 dy)
+      offsets - trial magnitude offsets of B with respect to A [mag]
+                (default: the best offset at each delay)
+      gap     - samples (or pairs) separated by more than gap are not
+                interpolated (paired) across [day] (default 10 times the
+                median sampling interval)
+      nmin    - minimum number of overlapping points (or pairs) for a
+                trial delay to be evaluated (default a quarter of the
+                samples of B, at least 10)
+      refine  - step of a second, finer grid of trial delays spanning 
+                two steps of delays on each side of its best delay
+                [day] (default 0.05 dy, 0 for none; for 'disp', none if
+                below the median sampling interval)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      tbest  - best delay [day], refined between the grid points
+      terr   - 1 sigma uncertainty of tbest [day] (NaN if undetermined)
+      delays - the trial delays, including those of the finer grid [day]
+      curve  - objective at each trial delay (reduced chi^2, D^2 or the
+               correlation coefficient), shape (ndelay,) or, if offsets
+               is input, (ndelay, noffset); NaN where not evaluated
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      lcsys = lc_system(111, 222, tdelay=[0., 14.7])
+      lcsys.car_gen(medres=1)
+      lcsys.sample(daily=1, season=1)
+      lcs = lcsys.lc_samp + lcsys.noise
+      tbest, terr, delays, curve = lc_tdelay(lcsys.time_samp, lcs[0],
+                                             lcs[1], errA=1.0857*0.03)
+
+    COMMENTS:
+      The delay is defined as in lc_add_tdelay, lcB(t) = lcA(t - tdelay)
+      + offset.  For every trial delay the sums that each objective needs
+      are accumulated over an (ndelay, nsamp) array, and the magnitude
+      offset enters only through those sums, so the best offset (or a
+      whole grid of offsets) costs nothing extra.  No sorting is needed:
+      the A neighbours of each delayed B point are found with a single
+      np.searchsorted.  The coarse grid followed by a fine grid around
+      its best delay keeps the number of trial delays (and the cost) 
+      small for a precise result.
+
+      The uncertainty is the half width of the region around the best
+      delay where chi^2 (not reduced) is within 1 of its minimum, i.e.
+      the error due to the photometric noise only.  For 'disp' and
+      'xcor' the same is applied to the pseudo chi^2 n D^2/D^2_min and
+      n (1 - r^2)/(1 - r_max^2) (n points or pairs at the best delay),
+      which is only an approximation.
+
+      'disp' pairs neighbouring points without interpolation, so for
+      images with the same cadence D^2 only changes where the pairs
+      change, i.e. at whole-sample shifts.  Its best delay is therefore
+      a point of the grid (no parabola, and no finer grid than the
+      median sampling interval), and terr is at least half the
+      sampling interval.  The linear interpolation of 'chi2' and 'xcor'
+      is biased for delays that are not whole-sample shifts of a
+      sparsely sampled curve (by up to a fair fraction of the sampling
+      interval); terr does not include that bias.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+      2026/10/17 - 'disp' resolution limited to the sampling interval
+
+    ------------------------------------------------------------
+    """
+
+# -------- defaults
+    method = 'chi2' if method==None else method
+    delays = np.arange(-120., 120.5, 1.0) if delays is None else \
+        np.atleast_1d(np.asarray(delays, dtype=float))
+    refine = 0.05 if refine==None else refine
+
+    if method not in ['chi2', 'disp', 'xcor']:
+        raise ValueError("LC_TDELAY: method '{0}' not understood, only " \
+                             "'chi2', 'disp' or 'xcor' are valid." \
+                             .format(method))
+
+
+
+# -------- utilities
+    tA   = np.asarray(time, dtype=float)
+    tB   = tA if timeB is None else np.asarray(timeB, dtype=float)
+    mA   = np.asarray(lcA, dtype=float)
+    mB   = np.asarray(lcB, dtype=float)
+    errA = 1.0857*0.03 if errA is None else errA
+    errB = errA if errB is None else errB
+    eA   = np.broadcast_to(errA, tA.shape).astype(float)
+    eB   = np.broadcast_to(errB, tB.shape).astype(float)
+    samp = np.median(np.diff(tA)) if tA.size > 1 else 0.0
+    gap  = 10.*samp if gap==None else gap
+    nmin = max(10, tB.size//4) if nmin==None else nmin
+    args = (tA, mA, eA, tB, mB, eB, offsets, method, gap, nmin)
+
+
+
+# -------- evaluate the objective on the grid of trial delays
+    curv, nn = lc_tdelay_curve(delays, *args)
+
+    if not np.isfinite(curv).any():
+        print "LC_TDELAY: no trial delay has {0} overlapping points" \
+            .format(nmin)
+        return np.nan, np.nan, delays, curv
+
+
+
+# -------- refine around the best delay of the grid and merge the curves
+#          (not below the sampling interval for 'disp', see below)
+    if method=='disp' and refine < samp: refine = 0
+
+    if refine and delays.size > 1:
+        prof  = lc_tdelay_prof(curv, method)
+        ibest = np.nanargmax(prof) if method=='xcor' else np.nanargmin(prof)
+        step  = np.abs(np.diff(delays)).max()
+        fine  = delays[ibest] + refine*np.arange(-np.ceil(2*step/refine), \
+                                                       np.ceil(2*step/refine) \
+                                                       + 1)
+        fine  = fine[~np.in1d(fine, delays)]
+
+        if fine.size:
+            cfine, nfine = lc_tdelay_curve(fine, *args)
+            order  = np.argsort(np.concatenate([delays, fine]), \
+                                    kind='mergesort')
+            delays = np.concatenate([delays, fine])[order]
+            curv   = np.concatenate([curv, cfine])[order]
+            nn     = np.concatenate([nn, nfine])[order]
+
+
+
+# -------- pseudo chi^2 profiled over the offsets (minimum is best)
+    prof = lc_tdelay_prof(curv, method)
+
+    if method=='chi2':
+        ibest = np.nanargmin(prof)
+        qq    = prof*(nn - 1.0)
+    elif method=='disp':
+        ibest = np.nanargmin(prof)
+        qq    = nn[ibest]*prof/max(prof[ibest], 1e-300)
+    else:
+        ibest = np.nanargmax(prof)
+        qq    = nn[ibest]*(1.0 - prof**2)/max(1.0 - prof[ibest]**2, 1e-300)
+
+    tbest, terr = lc_tdelay_peak(delays, qq, ibest)
+
+    # the dispersion is piecewise constant in the delay: the best delay
+    # is a grid point and no better than the sampling interval
+    if method=='disp':
+        tbest = delays[ibest]
+        terr  = np.fmax(terr, 0.5*samp)
+
+
+    return tbest, terr, delays, curv
+
+
+
+def lc_tdelay_curve(delays, tA, mA, eA, tB, mB, eB, offsets, method, gap, \
+                        nmin):
+
+    """ Evaluate the objective of lc_tdelay at the trial delays and
+        return it with the number of overlapping points (or pairs) at
+        each delay (utility for lc_tdelay) """
+
+# -------- delayed times of B and their neighbours in A, (ndelay, nB)
+    nA = tA.size
+    tq = tB - delays[:,np.newaxis]
+    ir = np.clip(np.searchsorted(tA, tq, side='left'), 1, nA-1)
+    il = ir - 1
+
+
+
+# -------- chi^2 and cross-correlation of B against interpolated A
+    if method in ['chi2', 'xcor']:
+        dtA  = tA[ir] - tA[il]
+        frac = (tq - tA[il])/np.where(dtA > 0, dtA, 1.0)
+        good = (frac >= 0.0) & (frac <= 1.0) & (dtA <= gap)
+        mint = mA[il] + frac*(mA[ir] - mA[il])
+
+        nn = good.sum(1).astype(float)
+
+        if method=='chi2':
+            vint = (1.0 - frac)**2*eA[il]**2 + frac**2*eA[ir]**2
+            w    = good/(vint + eB**2)
+            r    = np.where(good, mB - mint, 0.0)
+            wr   = w*r
+            sw   = w.sum(1)
+            sr   = wr.sum(1)
+            srr  = np.einsum('ij,ij->i', wr, r)
+
+            # chi^2(o) = srr - 2 o sr + o^2 sw, best at o = sr/sw
+            chi2 = srr - sr**2/np.where(sw > 0, sw, 1.0) if offsets is None \
+                else srr[:,np.newaxis] - 2.0*np.outer(sr, offsets) + \
+                np.outer(sw, np.asarray(offsets)**2)
+            nrm  = np.where(nn > 1, nn - 1.0, np.nan)
+            curv = chi2/(nrm if offsets is None else nrm[:,np.newaxis])
+
+        else:
+            x    = np.where(good, mint, 0.0)
+            y    = np.where(good, mB, 0.0)
+            n1   = np.maximum(nn, 1.0)
+            sx   = x.sum(1)
+            sy   = y.sum(1)
+            cxy  = np.einsum('ij,ij->i', x, y)/n1 - sx*sy/n1**2
+            cxx  = np.einsum('ij,ij->i', x, x)/n1 - (sx/n1)**2
+            cyy  = np.einsum('ij,ij->i', y, y)/n1 - (sy/n1)**2
+            curv = cxy/np.sqrt(np.maximum(cxx*cyy, 1e-300))
+
+            if offsets is not None:
+                curv = np.repeat(curv[:,np.newaxis], np.size(offsets), 1)
+
+
+
+# -------- dispersion of neighbouring A-B pairs of the combined curve
+    else:
+        ins = ir + (tq > tA[ir]) - (tq <= tA[il]) # unclipped searchsorted
+
+        # pair (A before B): B point with at least one A point since the
+        # previous B point; pair (B before A): likewise before the next
+        chg = ins[:,1:] != ins[:,:-1]
+        one = np.ones([delays.size, 1], dtype=bool)
+        ia  = np.clip(ins - 1, 0, nA-1)
+        ib  = np.clip(ins, 0, nA-1)
+        pab = np.concatenate([one, chg], 1) & (ins > 0) & (tq - tA[ia] <= gap)
+        pba = np.concatenate([chg, one], 1) & (ins < nA) & \
+            (tA[ib] - tq <= gap)
+
+        # D^2(o) = (sxx + 2 o sx + o^2 sw)/sw with diff = x + s o
+        wab = pab/(eA[ia]**2 + eB**2)
+        wba = pba/(eA[ib]**2 + eB**2)
+        xab = mA[ia] - mB
+        xba = mB - mA[ib]
+        sw  = wab.sum(1) + wba.sum(1)
+        sx  = np.einsum('ij,ij->i', wab, xab) - np.einsum('ij,ij->i', wba, xba)
+        sxx = np.einsum('ij,ij->i', wab*xab, xab) + \
+            np.einsum('ij,ij->i', wba*xba, xba)
+        sw1 = np.where(sw > 0, sw, 1.0)
+
+        nn   = (pab.sum(1) + pba.sum(1)).astype(float)
+        curv = (sxx - sx**2/sw1)/sw1 if offsets is None else \
+            (sxx[:,np.newaxis] + 2.0*np.outer(sx, offsets) + \
+                 np.outer(sw, np.asarray(offsets)**2))/sw1[:,np.newaxis]
+
+
+
+# -------- mask trial delays with too little overlap and return
+    ok = nn >= nmin
+
+
+    return np.where(ok if offsets is None else ok[:,np.newaxis], curv, \
+                        np.nan), nn
+
+
+
+def lc_tdelay_prof(curv, method):
+
+    """ Profile an objective curve of lc_tdelay over the offsets (utility
+        for lc_tdelay) """
+
+    if curv.ndim==1: return curv
+
+    allnan = ~np.isfinite(curv).any(1)
+    curv   = np.where(allnan[:,np.newaxis], 0.0, curv)
+    prof   = np.nanmax(curv, 1) if method=='xcor' else np.nanmin(curv, 1)
+
+    return np.where(allnan, np.nan, prof)
+
+
+
+def lc_tdelay_peak(delays, qq, ibest):
+
+    """ Refine the minimum of a pseudo chi^2 curve qq by a parabola through
+        the neighbouring grid points and return it with the half width of
+        the region where qq < qq.min() + 1 (utility for lc_tdelay) """
+
+# -------- refine the minimum between grid points
+    tbest = delays[ibest]
+
+    if 0 < ibest < delays.size-1 and np.isfinite(qq[ibest-1:ibest+2]).all():
+        ql, q0, qr = qq[ibest-1:ibest+2]
+        hl, hr     = delays[ibest] - delays[ibest-1], \
+            delays[ibest+1] - delays[ibest]
+        den        = hr*(ql - q0) + hl*(qr - q0)
+        if den > 0:
+            tbest += 0.5*(hr**2*(ql - q0) - hl**2*(qr - q0))/den
+
+
+
+# -------- delta chi^2 = 1 interval (linear interpolation of crossings)
+    thr   = qq[ibest] + 1.0
+    above = ~(qq <= thr) # NaN counts as above
+    left  = np.where(above[:ibest])[0]
+    right = np.where(above[ibest+1:])[0] + ibest + 1
+
+    if left.size==0 or right.size==0: return tbest, np.nan
+
+    il, ir = left[-1], right[0]
+    dl = delays[il] + (delays[il+1] - delays[il])* \
+        ((qq[il] - thr)/(qq[il] - qq[il+1]) if np.isfinite(qq[il]) else 1.0)
+    dr = delays[ir] - (delays[ir] - delays[ir-1])* \
+        ((qq[ir] - thr)/(qq[ir] - qq[ir-1]) if np.isfinite(qq[ir]) else 1.0)
+
+
+    return tbest, 0.5*(dr - dl)
+
+
+
+def lc_tdelay_good(filename, path=None, sysid=None, **kwargs):
+
+    """
+    NAME:
+      lc_tdelay_good
+
+    PURPOSE:
+      Estimate the time delays of images B, C, D with respect to A from a
+      'good' file (fits or ascii) or from one system of a multi-system
+      'good' file.
+
+    CALLING SEQUENCE:
+      tbest, terr, delays, curves = lc_tdelay_good(filename, path=, sysid=,
+                                                   method=, ...)
+
+    INPUTS:
+      filename - name of the 'good' file (.txt for ascii)
+
+    OPTIONAL INPUTS:
+      path  - path for the filename (default is present directory)
+      sysid - system identifier in a multi-system 'good' file (see
+              lc_goodfile)
+      other keywords are passed to lc_tdelay
+
+    KEYWORDS:
+
+    OUTPUTS:
+      tbest  - best delays of B, C, ... with respect to A [day]
+      terr   - their 1 sigma uncertainties [day]
+      delays - the trial delays, one vector per image pair [day]
+      curves - objective curves, one per image pair
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      tbest, terr, delays, curves = lc_tdelay_good('tdc_0_good.fits',
+                                                   path='rung0/')
+
+    COMMENTS:
+      Fluxes and errors in nanomaggies are converted back to magnitudes.
+      Each pair's finer grid is centred on its own best delay (see
+      lc_tdelay), so delays and curves are lists of per-pair vectors
+      of different lengths.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- read the table (time, lc_A, err_A, ... in nanomaggies)
+    input = (path if path else '') + filename
+
+    if sysid is not None:
+        data = lc_goodfile_read(filename, sysid, path=path)
+        flux = [data['lc_'+lab][0] for lab in 'ABCD' if 'lc_'+lab in \
+                    data.names]
+        ferr = [data['err_'+lab][0] for lab in 'ABCD' if 'err_'+lab in \
+                    data.names]
+        time = data.time[0]
+    elif filename.endswith('.txt'):
+        data = np.loadtxt(input, comments='#')
+        time = data[:,0]
+        flux = list(data[:,1::2].T)
+        ferr = list(data[:,2::2].T)
+    else:
+        data = fits.getdata(input)
+        flux = [data['lc_'+lab][0] for lab in 'ABCD' if 'lc_'+lab in \
+                    data.names]
+        ferr = [data['err_'+lab][0] for lab in 'ABCD' if 'err_'+lab in \
+                    data.names]
+        time = data.time[0]
+
+
+
+# -------- convert to magnitudes and estimate the delays
+    mags = [22.5 - 2.5*np.log10(iflux) for iflux in flux]
+    errs = [1.0857*ierr/iflux for iflux, ierr in zip(flux, ferr)]
+
+
+    return lc_tdelay_pairs(time, mags, errs, **kwargs)
+
+
+
+def lc_tdelay_pairs(time, lcs, errs, **kwargs):
+
+    """ Estimate the delays of images B, C, ... with respect to A and
+        return them as lc_tdelay_good does, with one vector of trial
+        delays and one curve per pair (utility for lc_tdelay_good and
+        lc_tdelay_system) """
+
+    res = [lc_tdelay(time, lcs[0], lcs[iimg], errA=errs[0], \
+                         errB=errs[iimg], timeB=time, **kwargs) \
+               for iimg in range(1, len(lcs))]
+
+    return np.array([ires[0] for ires in res]), \
+        np.array([ires[1] for ires in res]), [ires[2] for ires in res], \
+        [ires[3] for ires in res]
+
+
+
+def lc_tdelay_batch(inputs, nproc=None, **kwargs):
+
+    """
+    NAME:
+      lc_tdelay_batch
+
+    PURPOSE:
+      Estimate the time delays of many systems on a pool of processes.
+
+    CALLING SEQUENCE:
+      results = lc_tdelay_batch(inputs, nproc=, method=, ...)
+
+    INPUTS:
+      inputs - list of systems, each either the name of a 'good' file or
+               a tuple (time, lcs, errs) of sampled times, light curves
+               (A first) and errors [mag]
+
+    OPTIONAL INPUTS:
+      nproc - number of worker processes (default is the number of cpus)
+      other keywords are passed to lc_tdelay (or lc_tdelay_good)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      results - list of (tbest, terr, delays, curves) per system, in input
+                order, as from lc_tdelay_good
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+      res = lc_tdelay_batch(glob.glob('rung0/*_good.fits'), method='disp')
+
+    COMMENTS:
+      Systems are sent to the workers in chunks so that the per-system
+      overhead of the pool is small.
+
+    REVISION HISTORY:
+      2026/10/17 - Written
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    nproc = mp.cpu_count() if nproc==None else nproc
+    args  = [(iinp, kwargs) for iinp in inputs]
+
+
+
+# -------- estimate the delays (in a pool if desired) and return
+    if nproc > 1 and len(args) > 1:
+        pool    = mp.Pool(nproc)
+        results = pool.map(lc_tdelay_system, args, \
+                               chunksize=max(1, len(args)//(4*nproc)))
+        pool.close()
+        pool.join()
+    else:
+        results = [lc_tdelay_system(iarg) for iarg in args]
+
+
+    return results
+
+
+
+def lc_tdelay_system(args):
+
+    """ Estimate the time delays of one system of lc_tdelay_batch
+        (worker) """
+
+    inp, kwargs = args
+
+    if isinstance(inp, basestring): return lc_tdelay_good(inp, **kwargs)
+
+    time, lcs, errs = inp
+    errs = [None]*len(lcs) if errs is None else errs
+
+    return lc_tdelay_pairs(time, lcs, errs, **kwargs)
@@ -1,6 +1,10 @@
 import numpy as np
-import pyfits as fits
+from lc_metrics import *
+from lc_lazy import *
 
+fits = lc_lazy('pyfits')
+
+@lc_timed('lc_write')
 def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
                  ascii=None):
 
@@ -42,6 +46,10 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
       2013/02/18 - Written by Greg Dobler (KITP/UCSB)
       2013/03/12 - Modified "good" output to AB maggies (Dobler)
       2013/04/16 - Modified to add "good" ascii file functionality (Dobler)
+      2026/10/17 - Bulk formatting of the "good" ascii rows
+      2026/10/17 - Status messages through lc_log (silent by default)
+      2026/10/17 - "good" ascii header and rows moved to lc_good_ascii_*
+      2026/10/17 - usrind (the sampling schedule identity) as 64 bit
 
     ------------------------------------------------------------
     """
@@ -53,8 +61,8 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
 
 # -------- write fits file by type
     if type=='good':
-        print "LC_WRITE: Writing light curves to file ", out
-        print "LC_WRITE:   ...using 'good' file convention"
+        lc_log("LC_WRITE: Writing light curves to file " + out)
+        lc_log("LC_WRITE:   ...using 'good' file convention")
 
         # utilities
         if not isinstance(lcs, list): 
@@ -80,74 +88,20 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
 
         # if desired (...oof) write ascii
         if ascii!=None:
-            print "LC_WRITE:     ...writing ascii"
-
-            # open file
-            fout = open(out,'w')
-
-            # write header
-            fout.write("## Time Delay Challenge light curves\n")
-            fout.write("##\n")
-            fout.write("## [time]=days, [lc]=[err]=flux in nanomaggies\n")
-            fout.write("##\n")
-            fout.write("##")
-            fout.write("time".rjust(11))
-            for ilc in range(nlc):
-                fout.write(('lc_'+label[ilc]).rjust(11))
-                fout.write(('err_'+label[ilc]).rjust(11))
-            fout.write("\n")
-            fout.write("##")
-            fout.write("-----------")
-            for ilc in range(nlc): fout.write("----------------------")
-            fout.write("\n")
-
-            # write light curves and errors
-            ntime = time.size
-
-            for itime in range(ntime):
-                fout.write("  ")
-                fout.write("{0:11.5f}".format(time[itime]))
-
-                for ilc in range(nlc):
-                    lc_nm  = 10.**(-0.4*(lcs[ilc]-22.5)) # nanomaggies
-                    err_nm = lc_nm * errlcs[ilc] # nanomaggies
-
-                    fout.write("{0:11.5f}{1:11.5f}".format(lc_nm[itime], \
-                                                             err_nm[itime]))
-
-                fout.write("\n")
+            lc_log("LC_WRITE:     ...writing ascii")
 
-            fout.close()
-            return
+            # open file (buffered), write header and rows
+            fout = open(out, 'w', 2**20)
 
+            lc_good_ascii_header(fout, nlc)
+            lc_good_ascii_rows(fout, time, lcs, errlcs=errlcs)
 
-        # create table columns
-        col = [fits.Column(name='time', format=str(npts)+'E', unit='day', \
-                               array=time.reshape(1,npts))]
-
-        for ilc in range(nlc):
-            colname = 'lc_' + label[ilc]
-            coldata = 10.**(-0.4*(lcs[ilc]-22.5)) # nanomaggies
-
-            col.append(fits.Column(name=colname, format=str(npts)+'E', \
-                                       unit='nanomaggies', \
-                                       array=coldata.reshape(1,npts)))
-        
-        # create errors
-        if errlcs==None: errlcs = [0.03,0.03,0.03,0.03]
-
-        for ilc in range(nlc):
-            colname = 'err_' + label[ilc]
-            coldata = 10.**(-0.4*(lcs[ilc]-22.5))*errlcs[ilc] # nanomaggies
+            fout.close()
+            return
 
-            col.append(fits.Column(name=colname, \
-                                       format=str(npts)+'E', \
-                                       unit='nanomaggies', \
-                                       array= coldata.reshape(1,npts)))
 
-        # create headers
-        table_hdu      = fits.new_table(col)
-        table_hdu.name = "TDC Challenge Light Curves"
+        # create table and headers
+        table_hdu      = lc_good_table(time, lcs, errlcs=errlcs)
         phdu           = fits.PrimaryHDU()
         hdulist        = fits.HDUList([phdu, table_hdu])
 
@@ -155,8 +109,8 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
         hdulist.writeto(out, clobber=clobber)
 
     elif type=='evil':
-        print "LC_WRITE: Writing lightcurve instance to file ", out
-        print "LC_WRITE:   ...using 'evil' file convention"
+        lc_log("LC_WRITE: Writing lightcurve instance to file " + out)
+        lc_log("LC_WRITE:   ...using 'evil' file convention")
 
         if str(lcs.dtype)!='lightcurve':
             print "LC_WRITE:   'evil' convention only accepts " + \
@@ -174,7 +128,7 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
         form_fl2 = str(t2sz) + 'E'
         form_fl3 = str(t3sz) + 'E'
         form_fl4 = str(b1sz) + 'E'
-        form_in1 = str(i1sz) + 'J'
+        form_in1 = str(i1sz) + 'K'
 
         col = [ \
             fits.Column(name='seed',      format='J',      unit='none',           array=[lcs.seed]), \
@@ -213,3 +167,134 @@ def lc_write(time, lcs, type, filename, errlcs=None, path=None, clobber=None, \
         print "LC_WRITE:   ...only types 'good' or 'evil' are valid."
 
     return
+
+
+
+def lc_good_table(time, lcs, errlcs=None):
+
+    """
+    NAME:
+      lc_good_table
+
+    PURPOSE:
+      Create the fits binary table of the 'good' file convention (one row
+      of time, lc_A, ..., err_A, ... in nanomaggies) for a system of up to
+      four sampled lightcurves.
+
+    CALLING SEQUENCE:
+      table_hdu = lc_good_table(time, lcs, errlcs=)
+
+    INPUTS:
+      time - time vector in days
+      lcs  - list of >= 1 lightcurves [mag]
+
+    OPTIONAL INPUTS:
+      errlcs - error on the input lightcurves (default is 3% in flux)
+
+    KEYWORDS:
+
+    OUTPUTS:
+      table_hdu - fits binary table HDU
+
+    OPTIONAL OUTPUTS:
+
+    EXAMPLES:
+
+    COMMENTS:
+      Used by lc_write and lc_goodfile.
+
+    REVISION HISTORY:
+      2026/10/17 - Moved from lc_write
+
+    ------------------------------------------------------------
+    """
+
+# -------- utilities
+    nlc   = len(lcs)
+    npts  = lcs[0].size
+    label = ['A','B','C','D']
+
+
+
+# -------- create table columns
+    col = [fits.Column(name='time', format=str(npts)+'E', unit='day', \
+                           array=time.reshape(1,npts))]
+
+    for ilc in range(nlc):
+        colname = 'lc_' + label[ilc]
+        coldata = 10.**(-0.4*(lcs[ilc]-22.5)) # nanomaggies
+
+        col.append(fits.Column(name=colname, format=str(npts)+'E', \
+                                   unit='nanomaggies', \
+                                   array=coldata.reshape(1,npts)))
+
+    # create errors
+    if errlcs is None: errlcs = [0.03,0.03,0.03,0.03]
+
+    for ilc in range(nlc):
+        colname = 'err_' + label[ilc]
+        coldata = 10.**(-0.4*(lcs[ilc]-22.5))*errlcs[ilc] # nanomaggies
+
+        col.append(fits.Column(name=colname, \
+                                   format=str(npts)+'E', \
+                                   unit='nanomaggies', \
+                                   array= coldata.reshape(1,npts)))
+
+
+
+# -------- create header and return
+    table_hdu      = fits.new_table(col)
+    table_hdu.name = "TDC Challenge Light Curves"
+
+    return table_hdu
+
+
+
+def lc_good_ascii_header(fout, nlc):
+
+    """ Write the header of a 'good' ascii file of nlc light curves to the
+        open file fout """
+
+    label = ['A','B','C','D']
+
+    fout.write("## Time Delay Challenge light curves\n")
+    fout.write("##\n")
+    fout.write("## [time]=days, [lc]=[err]=flux in nanomaggies\n")
+    fout.write("##\n")
+    fout.write("##")
+    fout.write("time".rjust(11))
+    for ilc in range(nlc):
+        fout.write(('lc_'+label[ilc]).rjust(11))
+        fout.write(('err_'+label[ilc]).rjust(11))
+    fout.write("\n")
+    fout.write("##")
+    fout.write("-----------")
+    for ilc in range(nlc): fout.write("----------------------")
+    fout.write("\n")
+
+
+
+def lc_good_ascii_rows(fout, time, lcs, errlcs=None):
+
+    """ Write the rows of a 'good' ascii file (time and each light curve
+        [mag] with its error in % of flux, default 3%, in nanomaggies) to
+        the open file fout, so that a file can be written in chunks """
+
+    # convert to nanomaggies once and write the table in blocks of rows
+    # (one formatted string per block)
+    if errlcs is None: errlcs = [0.03,0.03,0.03,0.03]
+
+    nlc        = len(lcs)
+    table      = np.empty([time.size, 1 + 2*nlc])
+    table[:,0] = time
+
+    for ilc in range(nlc):
+        table[:,1+2*ilc] = 10.**(-0.4*(lcs[ilc]-22.5)) # nanomaggies
+        table[:,2+2*ilc] = table[:,1+2*ilc]*errlcs[ilc] # nanomaggies
+
+    rowfmt = "  " + "%11.5f"*(1 + 2*nlc) + "\n"
+    nblock = 4096
+
+    for irow in range(0, time.size, nblock):
+        block = table[irow:irow+nblock]
+        fout.write((rowfmt*block.shape[0]) % tuple(block.ravel()))
@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'py'))
+
+pytest.importorskip('pyfits')
+
+from lc_goodfile import lc_goodfile, lc_goodfile_read
+
+
+def test_goodfile_roundtrip(tmpdir):
+
+    """ Every system of a multi-system good file reads back as written """
+
+    systems = [('s0', np.arange(50.), [20. + 0.01*np.arange(50.), \
+                                           21. + 0.02*np.arange(50.)]), \
+                   ('s1', np.arange(80.)*2., [19. + 0.005*np.arange(80.)]), \
+                   ('s2', np.arange(30.)*3., [22. - 0.01*np.arange(30.), \
+                                                  22.5*np.ones(30), \
+                                                  21.*np.ones(30)])]
+
+    path = str(tmpdir) + '/'
+
+    with lc_goodfile('multi_good.fits', path=path) as gf:
+        for sysid, time, lcs in systems:
+            gf.append(time, lcs, errlcs=[0.03]*len(lcs), sysid=sysid)
+
+    index = lc_goodfile_read('multi_good.fits', path=path)
+
+    assert list(index.sysid) == [sysid for sysid, time, lcs in systems]
+    assert list(index.nimage) == [len(lcs) for sysid, time, lcs in systems]
+
+    for sysid, time, lcs in systems:
+        data = lc_goodfile_read('multi_good.fits', sysid, path=path)
+
+        assert 'sysid' not in data.names
+        assert sorted(data.names) == sorted(['time'] + \
+                                                ['lc_' + lab for lab in \
+                                                     'ABCD'[:len(lcs)]] + \
+                                                ['err_' + lab for lab in \
+                                                     'ABCD'[:len(lcs)]])
+        np.testing.assert_allclose(data.time[0], time, rtol=1e-6)
+
+        for lab, ilc in zip('ABCD', lcs):
+            np.testing.assert_allclose(data['lc_' + lab][0], \
+                                           10.**(-0.4*(ilc - 22.5)), \
+                                           rtol=1e-6)